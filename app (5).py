@@ -7,10 +7,16 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from pricing import PRICING_ENGINES, price_goals, predict_corners, predict_cards
+from value_bets import scan_value_bets
+from artifacts import (artifact_versions, load_feature_state, load_model, load_ratings, load_team_stats,
+                       load_team_strength)
+from leagues import APP_LEAGUE_KEYS
+from ledger import BetLedger
+
 # Page config
 st.set_page_config(
     page_title="Football Betting Predictor",
@@ -114,65 +120,52 @@ LEAGUES = {
     }
 }
 
-# Prediction functions (Monte Carlo simulation)
-def monte_carlo_simulation(home_goals_avg, away_goals_avg, n_simulations=10000):
-    """Monte Carlo simulation for match outcome"""
-    home_goals = np.random.poisson(home_goals_avg, n_simulations)
-    away_goals = np.random.poisson(away_goals_avg, n_simulations)
-    total_goals = home_goals + away_goals
-    
-    return {
-        'over_2_5': np.mean(total_goals > 2.5),
-        'under_2_5': 1 - np.mean(total_goals > 2.5),
-        'btts_yes': np.mean((home_goals > 0) & (away_goals > 0)),
-        'btts_no': 1 - np.mean((home_goals > 0) & (away_goals > 0)),
-        'avg_total_goals': np.mean(total_goals),
-        'goal_distribution': {
-            '0-1': np.mean(total_goals <= 1),
-            '2': np.mean(total_goals == 2),
-            '3': np.mean(total_goals == 3),
-            '4+': np.mean(total_goals >= 4)
-        }
-    }
+# Trained artifacts: loaded once per process, keyed by (path, mtime) so a
+# retrained or refreshed file is picked up on the next rerun
+@st.cache_resource(max_entries=len(LEAGUES), show_spinner="Loading model...")
+def cached_model(path, version):
+    return load_model(path)
 
-def predict_corners(home_corners_avg, away_corners_avg, n_simulations=10000):
-    """Monte Carlo simulation for corners"""
-    home_corners = np.random.poisson(home_corners_avg, n_simulations)
-    away_corners = np.random.poisson(away_corners_avg, n_simulations)
-    total_corners = home_corners + away_corners
-    
-    return {
-        'over_8_5': np.mean(total_corners > 8.5),
-        'over_9_5': np.mean(total_corners > 9.5),
-        'over_10_5': np.mean(total_corners > 10.5),
-        'over_11_5': np.mean(total_corners > 11.5),
-        'avg_total_corners': np.mean(total_corners)
-    }
+@st.cache_resource(max_entries=len(LEAGUES), show_spinner="Loading team stats...")
+def cached_team_stats(path, version):
+    return load_team_stats(path)
 
-def predict_cards(home_yellows_avg, away_yellows_avg, home_reds_avg=0.1, away_reds_avg=0.1, n_simulations=10000):
-    """Monte Carlo simulation for cards"""
-    home_yellows = np.random.poisson(home_yellows_avg, n_simulations)
-    away_yellows = np.random.poisson(away_yellows_avg, n_simulations)
-    home_reds = np.random.poisson(home_reds_avg, n_simulations)
-    away_reds = np.random.poisson(away_reds_avg, n_simulations)
-    
-    total_cards = home_yellows + away_yellows + home_reds + away_reds
-    booking_points = (home_yellows + away_yellows) * 10 + (home_reds + away_reds) * 25
-    
-    return {
-        'over_3_5': np.mean(total_cards > 3.5),
-        'over_4_5': np.mean(total_cards > 4.5),
-        'over_5_5': np.mean(total_cards > 5.5),
-        'avg_total_cards': np.mean(total_cards),
-        'avg_booking_points': np.mean(booking_points),
-        'over_40_booking_pts': np.mean(booking_points > 40),
-        'over_50_booking_pts': np.mean(booking_points > 50),
-        'over_60_booking_pts': np.mean(booking_points > 60)
-    }
+@st.cache_resource(max_entries=len(LEAGUES), show_spinner="Loading feature state...")
+def cached_feature_state(path, version):
+    return load_feature_state(path)
+
+@st.cache_resource(max_entries=len(LEAGUES), show_spinner="Loading team strengths...")
+def cached_team_strength(path, version):
+    return load_team_strength(path)
+
+@st.cache_resource(max_entries=1, show_spinner="Loading ratings...")
+def cached_ratings(path, version):
+    return load_ratings(path)
+
+ARTIFACT_LOADERS = {
+    'model': cached_model,
+    'team_stats': cached_team_stats,
+    'feature_state': cached_feature_state,
+    'team_strength': cached_team_strength,
+    'ratings': cached_ratings,
+}
+
+def get_league_artifacts(league):
+    """Model, team-stats snapshot, feature engine, team strengths and ratings for a league (None if not built)"""
+    artifacts = {}
+    for name, (path, version) in artifact_versions(APP_LEAGUE_KEYS[league]).items():
+        artifacts[name] = ARTIFACT_LOADERS[name](path, version) if version is not None else None
+    return artifacts
+
+def get_team_row(team, league):
+    team_stats = get_league_artifacts(league)['team_stats']
+    if team_stats is None:
+        return None
+    return team_stats.lookup(team)
 
 def get_team_stats(team, league):
-    """Simulate team stats (in production, use real data)"""
-    return {
+    """Team stats from the league snapshot (simulated if unavailable)"""
+    stats = {
         'goals_avg': np.random.uniform(1.0, 2.5),
         'conceded_avg': np.random.uniform(0.8, 2.0),
         'form': np.random.randint(5, 13),
@@ -180,42 +173,65 @@ def get_team_stats(team, league):
         'yellows_avg': np.random.uniform(1.5, 2.8),
         'reds_avg': np.random.uniform(0.05, 0.15)
     }
+    row = get_team_row(team, league)
+    if row is not None:
+        stats.update({key: row[key] for key in stats if pd.notna(row[key])})
+    return stats
 
 def get_form_details(team, league):
-    """Simulate form details"""
+    """Last 5 results and rest days (simulated if unavailable)"""
+    row = get_team_row(team, league)
+    if row is not None:
+        return {
+            'results': list(row['results']),
+            'days_since_last_match': (pd.Timestamp.now().normalize() - row['last_match_date']).days
+        }
     results = np.random.choice(['W', 'D', 'L'], size=5, p=[0.4, 0.3, 0.3])
     return {
         'results': list(results),
         'days_since_last_match': np.random.randint(3, 8)
     }
 
-def save_bet_to_csv(date, home_team, away_team, bet_type, odds, stake=0):
-    """Save bet to CSV"""
-    bet_data = {
-        'Date': date,
-        'Match': f"{home_team} vs {away_team}",
-        'Home_Team': home_team,
-        'Away_Team': away_team,
-        'Bet_Type': bet_type,
-        'Odds': odds,
-        'Stake': stake,
-        'Potential_Return': stake * odds if stake > 0 else 0,
-        'Result': 'Pending',
-        'Profit_Loss': 0,
-        'Logged_At': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    
-    csv_file = 'betting_tracker.csv'
-    file_exists = os.path.isfile(csv_file)
-    
-    df_new = pd.DataFrame([bet_data])
-    
-    if file_exists:
-        df_new.to_csv(csv_file, mode='a', header=False, index=False)
-    else:
-        df_new.to_csv(csv_file, mode='w', header=True, index=False)
-    
-    return bet_data
+def get_elo(team, league):
+    """Current Elo rating (None if ratings are not built or the team is unrated)"""
+    ratings = get_league_artifacts(league)['ratings']
+    if ratings is None or team not in ratings.ratings:
+        return None
+    return ratings.rating(team)
+
+def expected_goals(home_team, away_team, league, home_stats, away_stats):
+    """(home rate, away rate, rho): Dixon-Coles strengths if fitted, else raw goals averages"""
+    strength = get_league_artifacts(league)['team_strength']
+    if strength is None or home_team not in strength or away_team not in strength:
+        return home_stats['goals_avg'], away_stats['goals_avg'], 0.0
+    home_rate, away_rate = strength.expected_goals(home_team, away_team)
+    return home_rate, away_rate, strength.rho
+
+def predict_result(home_team, away_team, league):
+    """ML model 1X2 probabilities (None if no trained model)"""
+    artifacts = get_league_artifacts(league)
+    model, engine = artifacts['model'], artifacts['feature_state']
+    if model is None or engine is None:
+        return None
+    features = engine.features_for(home_team, away_team)
+    if artifacts['ratings'] is not None:
+        features.update(artifacts['ratings'].features_for(home_team, away_team))
+    if any(col not in features for col in model.feature_columns):
+        return None
+    probs = model.predict_proba(pd.DataFrame([features], columns=model.feature_columns))[0]
+    return {'away_win': probs[0], 'draw': probs[1], 'home_win': probs[2]}
+
+# Bet ledger (SQLite, shared by every session)
+LEDGER_PATH = 'data/ledger.db'
+HISTORY_ROWS = 500
+
+@st.cache_resource
+def get_ledger():
+    ledger = BetLedger(LEDGER_PATH)
+    # One-time import of the CSV tracker used by older versions
+    if os.path.isfile('betting_tracker.csv'):
+        ledger.migrate_csv('betting_tracker.csv')
+    return ledger
 
 # League selector
 selected_league = st.selectbox(
@@ -227,6 +243,23 @@ selected_league = st.selectbox(
 # Sidebar
 st.sidebar.header("🔧 Settings")
 st.sidebar.info(f"**Current League:** {selected_league}")
+league_model = get_league_artifacts(selected_league)['model']
+if league_model is not None:
+    st.sidebar.success("🤖 Trained model loaded")
+    calibrator = league_model.calibrator
+    if calibrator is not None and 'ece_calibrated' in calibrator.info:
+        st.sidebar.caption(f"Probabilities calibrated ({calibrator.method}): "
+                           f"ECE {calibrator.info['ece_raw']:.3f} → {calibrator.info['ece_calibrated']:.3f}")
+else:
+    st.sidebar.caption("No trained model for this league - using demo stats")
+
+# Pricing engine
+pricing_engine = st.sidebar.radio(
+    "Goals Pricing Engine",
+    options=list(PRICING_ENGINES.keys()),
+    format_func=lambda name: {'analytic': 'Analytic (exact Poisson)', 'monte_carlo': 'Monte Carlo (10,000 sims)'}[name],
+    index=0
+)
 
 # Show teams
 with st.sidebar.expander("📋 Team Names"):
@@ -237,24 +270,21 @@ with st.sidebar.expander("📋 Team Names"):
 # Betting history viewer
 st.sidebar.markdown("---")
 if st.sidebar.button("📊 View Betting History"):
-    if os.path.isfile('betting_tracker.csv'):
-        df_history = pd.read_csv('betting_tracker.csv')
-        
+    ledger = get_ledger()
+    totals = ledger.totals()
+    
+    if totals['total_bets'] > 0:
         with st.expander("📊 Betting History", expanded=True):
-            st.dataframe(df_history, use_container_width=True)
+            st.dataframe(ledger.history(limit=HISTORY_ROWS), use_container_width=True)
+            if totals['total_bets'] > HISTORY_ROWS:
+                st.caption(f"Showing the latest {HISTORY_ROWS} of {totals['total_bets']} bets")
             
-            if len(df_history) > 0:
-                col1, col2, col3, col4 = st.columns(4)
-                
-                pending = df_history[df_history['Result'] == 'Pending'].shape[0]
-                won = df_history[df_history['Result'] == 'Won'].shape[0]
-                lost = df_history[df_history['Result'] == 'Lost'].shape[0]
-                total_profit = df_history['Profit_Loss'].sum()
-                
-                col1.metric("Total Bets", len(df_history))
-                col2.metric("Pending", pending)
-                col3.metric("Won", won, delta=f"{lost} lost")
-                col4.metric("Total P/L", f"{total_profit:+.2f} units")
+            col1, col2, col3, col4 = st.columns(4)
+            
+            col1.metric("Total Bets", totals['total_bets'])
+            col2.metric("Pending", totals['pending'])
+            col3.metric("Won", totals['won'], delta=f"{totals['lost']} lost")
+            col4.metric("Total P/L", f"{totals['profit_loss']:+.2f} units")
     else:
         st.sidebar.info("No bets tracked yet")
 
@@ -326,10 +356,14 @@ if st.button("🔮 Make Prediction", type="primary", use_container_width=True):
         away_form_details = get_form_details(away_team, selected_league)
         
         # Get predictions
-        goals_prediction = monte_carlo_simulation(home_stats['goals_avg'], away_stats['goals_avg'])
+        home_rate, away_rate, rho = expected_goals(home_team, away_team, selected_league, home_stats, away_stats)
+        goals_prediction = price_goals(home_rate, away_rate, engine=pricing_engine, rho=rho)
         corners_prediction = predict_corners(home_stats['corners_avg'], away_stats['corners_avg'])
         cards_prediction = predict_cards(home_stats['yellows_avg'], away_stats['yellows_avg'], 
                                         home_stats['reds_avg'], away_stats['reds_avg'])
+        result_prediction = predict_result(home_team, away_team, selected_league)
+        home_elo = get_elo(home_team, selected_league)
+        away_elo = get_elo(away_team, selected_league)
         
         # Display results
         st.markdown("---")
@@ -404,9 +438,12 @@ if st.button("🔮 Make Prediction", type="primary", use_container_width=True):
             st.metric(f"{home_team} Corners/Game", f"{home_stats['corners_avg']:.1f}")
             st.metric(f"{home_team} Cards/Game", f"{home_stats['yellows_avg']:.1f}")
             st.metric(f"{home_team} Form", f"{home_stats['form']}/15")
+            if home_elo is not None:
+                st.metric(f"{home_team} Elo", f"{home_elo:.0f}")
         
         with col2:
             st.metric("Expected Total Goals", f"{goals_prediction['avg_total_goals']:.2f}")
+            st.caption(f"Expected goals: {home_rate:.2f} - {away_rate:.2f}")
             st.metric("Expected Total Corners", f"{corners_prediction['avg_total_corners']:.1f}")
             st.metric("Expected Total Cards", f"{cards_prediction['avg_total_cards']:.1f}")
         
@@ -415,131 +452,79 @@ if st.button("🔮 Make Prediction", type="primary", use_container_width=True):
             st.metric(f"{away_team} Corners/Game", f"{away_stats['corners_avg']:.1f}")
             st.metric(f"{away_team} Cards/Game", f"{away_stats['yellows_avg']:.1f}")
             st.metric(f"{away_team} Form", f"{away_stats['form']}/15")
+            if away_elo is not None:
+                st.metric(f"{away_team} Elo", f"{away_elo:.0f}")
         
         st.markdown("---")
         
-        # Predictions
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # Over/Under 2.5
-        with col1:
-            st.subheader("📈 Over/Under 2.5")
-            
-            ou_prob = goals_prediction['over_2_5']
-            if ou_prob > 0.5:
-                ou_bet_type = "Over 2.5"
-                ou_bet_odds = over_odds
-                ou_ev = (ou_prob * over_odds) - 1
-            else:
-                ou_bet_type = "Under 2.5"
-                ou_bet_odds = under_odds
-                ou_prob = 1 - ou_prob
-                ou_ev = (ou_prob * under_odds) - 1
-            
-            confidence = max(goals_prediction['over_2_5'], goals_prediction['under_2_5'])
-            
-            st.metric("Prediction", ou_bet_type, f"{confidence:.1%}")
-            st.metric("Model Prob", f"{ou_prob:.1%}")
-            st.metric("Odds", f"{ou_bet_odds:.2f}")
-            st.metric("EV", f"{ou_ev:+.1%}")
-            
-            if ou_ev > edge_threshold and confidence >= confidence_threshold:
-                st.success(f"✅ VALUE BET! {ou_ev:.1%}")
-            else:
-                st.error(f"❌ No value")
+        # ML model result probabilities
+        if result_prediction is not None:
+            st.subheader("🤖 ML Model (1X2)")
+            col_r1, col_r2, col_r3 = st.columns(3)
+            col_r1.metric(f"{home_team} Win", f"{result_prediction['home_win']:.1%}")
+            col_r2.metric("Draw", f"{result_prediction['draw']:.1%}")
+            col_r3.metric(f"{away_team} Win", f"{result_prediction['away_win']:.1%}")
+            st.markdown("---")
         
-        # BTTS
-        with col2:
-            st.subheader("⚽ BTTS")
-            
-            btts_prob = goals_prediction['btts_yes']
-            if btts_prob > 0.5:
-                btts_bet_type = "Yes"
-                btts_bet_odds = btts_yes_odds
-                btts_ev = (btts_prob * btts_yes_odds) - 1
-            else:
-                btts_bet_type = "No"
-                btts_bet_odds = btts_no_odds
-                btts_prob = 1 - btts_prob
-                btts_ev = (btts_prob * btts_no_odds) - 1
-            
-            confidence = max(goals_prediction['btts_yes'], goals_prediction['btts_no'])
-            
-            st.metric("Prediction", btts_bet_type, f"{confidence:.1%}")
-            st.metric("Model Prob", f"{btts_prob:.1%}")
-            st.metric("Odds", f"{btts_bet_odds:.2f}")
-            st.metric("EV", f"{btts_ev:+.1%}")
-            
-            if btts_ev > edge_threshold and confidence >= confidence_threshold:
-                st.success(f"✅ VALUE BET! {btts_ev:.1%}")
-            else:
-                st.error(f"❌ No value")
+        # Predictions
+        model_probs = {
+            'over_2_5': goals_prediction['over_2_5'],
+            'under_2_5': goals_prediction['under_2_5'],
+            'btts_yes': goals_prediction['btts_yes'],
+            'btts_no': goals_prediction['btts_no'],
+            'corners_over_10_5': corners_prediction['over_10_5'],
+            'corners_under_10_5': 1 - corners_prediction['over_10_5'],
+            'cards_over_4_5': cards_prediction['over_4_5'],
+            'cards_under_4_5': 1 - cards_prediction['over_4_5'],
+        }
+        bookmaker_odds = {
+            'over_2_5': over_odds,
+            'under_2_5': under_odds,
+            'btts_yes': btts_yes_odds,
+            'btts_no': btts_no_odds,
+            'corners_over_10_5': over_corners_odds,
+            'corners_under_10_5': under_corners_odds,
+            'cards_over_4_5': over_cards_odds,
+            'cards_under_4_5': under_cards_odds,
+        }
+        lines = pd.DataFrame({
+            'fixture': f"{home_team} vs {away_team}",
+            'market': list(model_probs.keys()),
+            'model_prob': list(model_probs.values()),
+            'odds': [bookmaker_odds[market] for market in model_probs],
+        })
+        scanned = scan_value_bets(lines, edge_threshold, confidence_threshold)
+        picks = scanned[scanned['selected']].set_index('group')
         
-        # Corners
-        with col3:
-            st.subheader("🚩 Corners")
-            
-            corners_prob = corners_prediction['over_10_5']
-            over_ev = (corners_prob * over_corners_odds) - 1
-            under_ev = ((1 - corners_prob) * under_corners_odds) - 1
-            
-            if over_ev > under_ev:
-                corners_bet_type = "Over 10.5"
-                corners_bet_odds = over_corners_odds
-                corners_ev = over_ev
-                corners_bet_prob = corners_prob
-            else:
-                corners_bet_type = "Under 10.5"
-                corners_bet_odds = under_corners_odds
-                corners_ev = under_ev
-                corners_bet_prob = 1 - corners_prob
-            
-            confidence = max(corners_prob, 1 - corners_prob)
-            
-            st.metric("Prediction", corners_bet_type, f"{confidence:.1%}")
-            st.metric("Model Prob", f"{corners_bet_prob:.1%}")
-            st.metric("Odds", f"{corners_bet_odds:.2f}")
-            st.metric("EV", f"{corners_ev:+.1%}")
-            
-            if corners_ev > edge_threshold and confidence >= confidence_threshold:
-                st.success(f"✅ VALUE BET! {corners_ev:.1%}")
-            else:
-                st.error(f"❌ No value")
+        market_columns = st.columns(4)
+        market_titles = [
+            ('goals_2_5', "📈 Over/Under 2.5"),
+            ('btts', "⚽ BTTS"),
+            ('corners_10_5', "🚩 Corners"),
+            ('cards_4_5', "🟨 Cards"),
+        ]
         
-        # Cards
-        with col4:
-            st.subheader("🟨 Cards")
-            
-            cards_prob = cards_prediction['over_4_5']
-            over_ev = (cards_prob * over_cards_odds) - 1
-            under_ev = ((1 - cards_prob) * under_cards_odds) - 1
-            
-            if over_ev > under_ev:
-                cards_bet_type = "Over 4.5"
-                cards_bet_odds = over_cards_odds
-                cards_ev = over_ev
-                cards_bet_prob = cards_prob
-            else:
-                cards_bet_type = "Under 4.5"
-                cards_bet_odds = under_cards_odds
-                cards_ev = under_ev
-                cards_bet_prob = 1 - cards_prob
-            
-            confidence = max(cards_prob, 1 - cards_prob)
-            
-            st.metric("Prediction", cards_bet_type, f"{confidence:.1%}")
-            st.metric("Model Prob", f"{cards_bet_prob:.1%}")
-            st.metric("Odds", f"{cards_bet_odds:.2f}")
-            st.metric("EV", f"{cards_ev:+.1%}")
-            
-            if cards_ev > edge_threshold and confidence >= confidence_threshold:
-                st.success(f"✅ VALUE BET! {cards_ev:.1%}")
-            else:
-                st.error(f"❌ No value")
+        for column, (group, title) in zip(market_columns, market_titles):
+            pick = picks.loc[group]
+            with column:
+                st.subheader(title)
+                
+                st.metric("Prediction", pick['selection'], f"{pick['confidence']:.1%}")
+                st.metric("Model Prob", f"{pick['model_prob']:.1%}")
+                st.metric("Odds", f"{pick['odds']:.2f}")
+                st.metric("EV", f"{pick['ev']:+.1%}")
+                
+                if pick['value']:
+                    st.success(f"✅ VALUE BET! {pick['ev']:.1%}")
+                else:
+                    st.error(f"❌ No value")
         
-        # Monte Carlo details
+        # Goal distribution
         st.markdown("---")
-        st.subheader("🎲 Goal Distribution (10,000 simulations)")
+        if pricing_engine == 'monte_carlo':
+            st.subheader("🎲 Goal Distribution (10,000 simulations)")
+        else:
+            st.subheader("🎲 Goal Distribution (exact Poisson)")
         
         goal_dist = goals_prediction['goal_distribution']
         dist_df = pd.DataFrame({
@@ -552,20 +537,12 @@ if st.button("🔮 Make Prediction", type="primary", use_container_width=True):
         st.markdown("---")
         st.header("🎯 Recommended Bets")
         
-        value_bets = []
-        if ou_ev > edge_threshold and max(goals_prediction['over_2_5'], goals_prediction['under_2_5']) >= confidence_threshold:
-            value_bets.append(f"**{ou_bet_type}** @ {ou_bet_odds:.2f} (EV: {ou_ev:+.1%})")
-        if btts_ev > edge_threshold and max(goals_prediction['btts_yes'], goals_prediction['btts_no']) >= confidence_threshold:
-            value_bets.append(f"**BTTS {btts_bet_type}** @ {btts_bet_odds:.2f} (EV: {btts_ev:+.1%})")
-        if corners_ev > edge_threshold and confidence >= confidence_threshold:
-            value_bets.append(f"**{corners_bet_type} corners** @ {corners_bet_odds:.2f} (EV: {corners_ev:+.1%})")
-        if cards_ev > edge_threshold and confidence >= confidence_threshold:
-            value_bets.append(f"**{cards_bet_type} cards** @ {cards_bet_odds:.2f} (EV: {cards_ev:+.1%})")
+        value_bets = scanned[scanned['value']]
         
-        if value_bets:
+        if not value_bets.empty:
             st.success("✅ **VALUE BETS FOUND:**")
-            for bet in value_bets:
-                st.markdown(f"• {bet}")
+            for _, bet in value_bets.iterrows():
+                st.markdown(f"• **{bet['selection']}** @ {bet['odds']:.2f} (EV: {bet['ev']:+.1%})")
         else:
             st.warning("⚠️ No value bets with current settings")
         
@@ -609,7 +586,7 @@ if st.session_state.prediction_made:
         
         if st.form_submit_button("💾 Save Bet", type="primary"):
             if bet_type_input:
-                save_bet_to_csv(
+                get_ledger().add_bet(
                     date=match_date.strftime('%Y-%m-%d'),
                     home_team=pred_home,
                     away_team=pred_away,
@@ -0,0 +1,146 @@
+"""
+Trained artifacts: saving and loading
+
+Each league has:
+    models/{league}_model.ubj           XGBoost booster (native UBJSON)
+    models/{league}_model.json          metadata sidecar (feature order, league,
+                                        training date range, metrics, data hash,
+                                        probability calibration)
+    models/{league}_team_stats.npz      team-stats snapshot
+    models/{league}_feature_state.pkl   rolling feature engine
+    models/{league}_team_strength.npz   Dixon-Coles team strengths
+
+plus models/ratings.pkl, the Elo ratings shared by every league.
+
+Boosters load without unpickling the sklearn wrapper: no arbitrary code
+runs on load, the files do not depend on the sklearn version, and
+predictions skip the wrapper through inplace_predict.
+Every artifact is identified by (path, mtime), so callers can cache loads
+and pick up a retrained file as soon as it is replaced on disk.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from atomic import atomic_write
+from calibration import Calibrator
+from ratings import load_ratings, ratings_path
+from team_stats import TeamStatsSnapshot, feature_state_path, team_stats_path
+from team_strength import TeamStrength, team_strength_path
+
+MODEL_FORMAT = 'xgboost-ubj'
+CLASS_NAMES = ['Away Win', 'Draw', 'Home Win']
+
+
+def model_path(league, models_dir='models'):
+    return os.path.join(models_dir, f"{league}_model.ubj")
+
+
+def metadata_path(path):
+    """Sidecar next to a booster file"""
+    return os.path.splitext(path)[0] + '.json'
+
+
+def file_version(path):
+    """Modification time used as a cache key (None if the file is missing)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def data_hash(matches):
+    """Content hash of the training matches (order-independent)"""
+    columns = [c for c in ['league', 'date', 'home_team', 'away_team', 'home_goals', 'away_goals']
+               if c in matches.columns]
+    rows = pd.util.hash_pandas_object(matches[columns].astype(str), index=False).to_numpy()
+    return hashlib.sha256(np.sort(rows).tobytes()).hexdigest()
+
+
+def save_model(model, path, metadata):
+    """
+    Write a booster and its metadata sidecar
+
+    The sidecar goes first: the booster's mtime is the cache key, so a
+    reader that sees the new booster always finds the new metadata.
+    Rounds past metadata['n_trees'] (early-stopping patience) are dropped.
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    n_trees = metadata.get('n_trees')
+    if n_trees and n_trees < booster.num_boosted_rounds():
+        booster = booster[:n_trees]
+    with atomic_write(metadata_path(path), 'w') as f:
+        json.dump({'format': MODEL_FORMAT, **metadata}, f, indent=2, default=str)
+    with atomic_write(path) as f:
+        f.write(booster.save_raw(raw_format='ubj'))
+    return path
+
+
+class LeagueModel:
+    """
+    Booster plus metadata, predicting with inplace_predict
+
+    predict_proba takes a DataFrame (columns are reordered to the training
+    feature order) or a 2-D array already in that order, and returns
+    (N, 3) probabilities for Away Win, Draw, Home Win, calibrated when
+    the model was saved with a calibration map.
+    """
+
+    def __init__(self, booster, metadata):
+        self.booster = booster
+        self.metadata = metadata
+        self.feature_columns = metadata['feature_columns']
+        self.n_trees = metadata.get('n_trees')
+        calibration = metadata.get('calibration')
+        self.calibrator = Calibrator.from_dict(calibration) if calibration else None
+
+    def predict_proba(self, X, calibrated=True):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_columns].to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        iteration_range = (0, self.n_trees) if self.n_trees else (0, 0)
+        proba = self.booster.inplace_predict(X, iteration_range=iteration_range)
+        if calibrated and self.calibrator is not None:
+            return self.calibrator.apply(proba)
+        return proba
+
+
+def load_model(path):
+    with open(metadata_path(path)) as f:
+        metadata = json.load(f)
+    if metadata.get('format') != MODEL_FORMAT:
+        raise ValueError(f"{path}: unsupported model format {metadata.get('format')}")
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return LeagueModel(booster, metadata)
+
+
+def load_team_stats(path):
+    return TeamStatsSnapshot.load(path)
+
+
+def load_feature_state(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_team_strength(path):
+    return TeamStrength.load(path)
+
+
+def artifact_versions(league, models_dir='models'):
+    """{'model': (path, mtime), 'team_stats': ..., 'feature_state': ..., 'team_strength': ..., 'ratings': ...}"""
+    paths = {
+        'model': model_path(league, models_dir),
+        'team_stats': team_stats_path(league, models_dir),
+        'feature_state': feature_state_path(league, models_dir),
+        'team_strength': team_strength_path(league, models_dir),
+        'ratings': ratings_path(models_dir),
+    }
+    return {name: (path, file_version(path)) for name, path in paths.items()}
@@ -0,0 +1,29 @@
+"""
+Atomic file writes
+
+Artifacts are written to a temporary file in the target directory and
+renamed into place, so readers (the app, other workers) only ever see
+the old file or the complete new one.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='wb'):
+    """Open a temp file next to `path`; it replaces `path` on a clean exit"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,314 @@
+"""
+Backtest the value-bet strategy on historical odds
+
+Replays each league's match history in date order. Every fixture is
+priced only from matches played before its date, the way the app prices
+it (--pricing):
+- dixon_coles (default): Dixon-Coles expected goals and rho, refitted
+  before every matchday on the earlier matches (each fit warm-started
+  from the previous one); teams the fit does not know fall back to
+  their goal averages, as in the app
+- form: the per-team goal averages (last 10 matches) with rho 0, the
+  app's pricing before team strengths were fitted
+The goal averages come from one cumulative-sum pass over the league's
+history, not a rescan per match. The app's value-bet rules are then
+applied to stored bookmaker odds, and the selected bets are settled
+against the real results.
+
+Leagues run in parallel worker processes.
+
+Odds file (CSV or Parquet), one row per fixture x market:
+    date, home_team, away_team, market, odds[, closing_odds][, league]
+Markets use the pricing column names ('over_2_5', 'btts_yes', 'home_win', ...).
+Markets the history cannot price (corners, cards) are ignored.
+
+Reported per league and threshold pair: bets, ROI, hit rate, max
+drawdown (units, 1-unit flat stakes) and CLV (mean odds / closing_odds - 1).
+
+Usage:
+    python backtest.py --odds data/odds.parquet
+    python backtest.py --odds data/odds.csv --league seria_a --edge 0.03 0.05 0.08 --confidence 0.55 0.60
+    python backtest.py --odds data/odds.parquet --pricing form
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from features import team_perspective, trailing_window_sums
+from match_store import MatchStore
+from pricing import price_fixture_frame
+from settlement import settle_bets
+from team_stats import STATS_WINDOW
+from team_strength import fit_team_strength
+from value_bets import scan_value_bets
+
+MIN_MATCHES = 3  # Prior matches each team needs before its fixtures are priced
+MATCH_KEYS = ['date', 'home_team', 'away_team']
+PRICING_METHODS = ['dixon_coles', 'form']
+
+
+def pre_match_rates(matches, window=STATS_WINDOW, min_matches=MIN_MATCHES):
+    """
+    Expected goals per fixture from matches strictly before its date
+
+    Returns a DataFrame aligned with `matches` (sorted by date) with
+    home_goals_avg, away_goals_avg (last `window` matches), rho (0) and a
+    `priced` flag (both teams have at least `min_matches` prior matches).
+    """
+    n = len(matches)
+    long_df = team_perspective(matches)
+    team_codes, _ = pd.factorize(long_df['team'])
+    sums, counts = trailing_window_sums(
+        team_codes, long_df['match'].to_numpy(), long_df['date'].to_numpy(),
+        long_df[['goals_for']].to_numpy(dtype=np.float64), window
+    )
+    avg = np.divide(sums[:, 0], counts, out=np.full(2 * n, np.nan), where=counts > 0)
+    return pd.DataFrame({
+        'home_goals_avg': avg[:n],
+        'away_goals_avg': avg[n:],
+        'rho': 0.0,
+        'priced': (counts[:n] >= min_matches) & (counts[n:] >= min_matches),
+    }, index=matches.index)
+
+
+def pre_match_strengths(matches, rates):
+    """
+    Replace the priced fixtures' goal averages with Dixon-Coles expected goals
+
+    Strengths are refitted before every matchday with a priced fixture,
+    on the matches before that date, starting from the previous fit.
+    Fixtures with a team the fit does not know keep the averages and
+    rho 0, like the app's expected_goals.
+
+    Args:
+        matches: sorted by date, as for pre_match_rates
+        rates: pre_match_rates output
+    """
+    rates = rates.copy()
+    dates = matches['date'].to_numpy(dtype='datetime64[ns]')
+    home_teams = matches['home_team'].to_numpy()
+    away_teams = matches['away_team'].to_numpy()
+    priced = rates['priced'].to_numpy()
+    home_rate = rates['home_goals_avg'].to_numpy(copy=True)
+    away_rate = rates['away_goals_avg'].to_numpy(copy=True)
+    rho = np.zeros(len(matches))
+
+    strength = None
+    for day in np.unique(dates[priced]):
+        start, end = np.searchsorted(dates, day, 'left'), np.searchsorted(dates, day, 'right')
+        strength = fit_team_strength(matches.iloc[:start], previous=strength)
+        rows = start + np.flatnonzero(priced[start:end])
+        known = np.array([home_teams[i] in strength and away_teams[i] in strength for i in rows], dtype=bool)
+        rows = rows[known]
+        if len(rows):
+            home_rate[rows], away_rate[rows] = strength.expected_goals(home_teams[rows], away_teams[rows])
+            rho[rows] = strength.rho
+
+    rates['home_goals_avg'] = home_rate
+    rates['away_goals_avg'] = away_rate
+    rates['rho'] = rho
+    return rates
+
+
+def pre_match_prices(matches, engine='analytic', pricing='dixon_coles'):
+    """
+    Market probabilities for every priced fixture, from its pre-match history
+
+    Args:
+        matches: sorted by date, as for pre_match_rates
+        pricing: 'dixon_coles' or 'form' (see module docstring)
+
+    Returns:
+        price_fixtures DataFrame indexed by row position in `matches`
+    """
+    if pricing not in PRICING_METHODS:
+        raise ValueError(f"Unknown pricing method: {pricing}")
+    rates = pre_match_rates(matches)
+    if pricing == 'dixon_coles':
+        rates = pre_match_strengths(matches, rates)
+    fixtures = rates[rates['priced']]
+    # rho only applies to the analytic engine, as in price_goals
+    rho = fixtures['rho'].to_numpy() if engine == 'analytic' else 0.0
+    return price_fixture_frame(fixtures[['home_goals_avg', 'away_goals_avg']], engine=engine, rho=rho)
+
+
+def read_odds(path, league=None):
+    """Historical odds, optionally restricted to one league"""
+    odds = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    if league is not None and 'league' in odds.columns:
+        odds = odds[odds['league'].astype(str) == league]
+    odds = odds.copy()
+    odds['date'] = pd.to_datetime(odds['date'])
+    odds['home_team'] = odds['home_team'].astype(str)
+    odds['away_team'] = odds['away_team'].astype(str)
+    return odds
+
+
+def max_drawdown(profit_loss):
+    """Largest peak-to-trough fall of the cumulative P/L (starting from 0)"""
+    cumulative = np.cumsum(np.r_[0.0, profit_loss])
+    return float(np.max(np.maximum.accumulate(cumulative) - cumulative))
+
+
+def summarize(bets):
+    """ROI, hit rate, drawdown and CLV for settled 1-unit bets in date order"""
+    won = int((bets['result'] == 'Won').sum())
+    lost = int((bets['result'] == 'Lost').sum())
+    staked = float(len(bets))
+    profit = float(bets['profit_loss'].sum())
+    clv = np.nan
+    if 'closing_odds' in bets.columns and bets['closing_odds'].notna().any():
+        clv = float((bets['odds'] / bets['closing_odds'] - 1).mean())
+    return {
+        'bets': len(bets),
+        'won': won,
+        'lost': lost,
+        'profit': profit,
+        'roi': profit / staked if staked else np.nan,
+        'hit_rate': won / (won + lost) if won + lost else np.nan,
+        'max_drawdown': max_drawdown(bets['profit_loss'].to_numpy()),
+        'clv': clv,
+    }
+
+
+def backtest_league(matches, odds, edges=(0.05,), confidences=(0.60,), engine='analytic',
+                    pricing='dixon_coles'):
+    """
+    Backtest one league
+
+    Args:
+        matches: the league's results (date, home_team, away_team, home_goals, away_goals)
+        odds: historical odds (see module docstring)
+        edges, confidences: value-bet thresholds to evaluate (every pair)
+        pricing: 'dixon_coles' or 'form' (see module docstring)
+
+    Returns:
+        (report rows, settled bets for every threshold pair)
+    """
+    matches = matches.sort_values('date', kind='stable').reset_index(drop=True)
+    matches['home_team'] = matches['home_team'].astype(str)
+    matches['away_team'] = matches['away_team'].astype(str)
+
+    priced = pre_match_prices(matches, engine, pricing)
+
+    # Odds -> fixture ids (row positions in `matches`) for priced markets only
+    fixture_ids = matches[MATCH_KEYS].assign(fixture=np.arange(len(matches)))
+    lines = odds.merge(fixture_ids, on=MATCH_KEYS, how='inner')
+    lines = lines[lines['fixture'].isin(priced.index) & lines['market'].isin(priced.columns)]
+    if lines.empty:
+        return [], pd.DataFrame()
+
+    rows = priced.index.get_indexer(lines['fixture'])
+    cols = priced.columns.get_indexer(lines['market'])
+    lines = lines.assign(model_prob=priced.to_numpy(dtype=np.float64)[rows, cols])
+
+    # Scan once with open thresholds; each pair is then a mask over the picks
+    scanned = scan_value_bets(lines, edge_threshold=-np.inf, confidence_threshold=0.0)
+    picks = scanned[scanned['selected']].copy()
+    picks['id'] = np.arange(len(picks))
+    picks['bet_type'] = picks['selection']
+    picks['stake'] = 1.0
+    bet_columns = ['id', 'date', 'home_team', 'away_team', 'bet_type', 'odds', 'stake']
+    settled = picks.merge(settle_bets(picks[bet_columns], matches), on='id')
+    settled = settled.sort_values(['date', 'fixture', 'id'], kind='stable')
+
+    report, bets = [], []
+    for edge, confidence in product(edges, confidences):
+        chosen = settled[(settled['ev'] > edge) & (settled['confidence'] >= confidence)]
+        report.append({'edge': edge, 'confidence': confidence, **summarize(chosen)})
+        bets.append(chosen.assign(edge=edge, confidence_threshold=confidence))
+    return report, pd.concat(bets, ignore_index=True)
+
+
+def _run_league(league, store_root, odds_path, edges, confidences, engine, pricing):
+    """Worker: load one league's data and backtest it"""
+    start = time.perf_counter()
+    matches = MatchStore(store_root).read(league=league)
+    odds = read_odds(odds_path, league)
+    report, bets = backtest_league(matches, odds, edges, confidences, engine, pricing)
+    for row in report:
+        row['league'] = league
+        row['matches'] = len(matches)
+        row['seconds'] = time.perf_counter() - start
+    if len(bets):
+        bets['league'] = league
+    return report, bets
+
+
+def run_backtest(leagues, store_root, odds_path, edges, confidences, engine='analytic', max_workers=None,
+                 pricing='dixon_coles'):
+    """Backtest several leagues in parallel; returns (report, bets)"""
+    max_workers = max_workers or min(len(leagues), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_run_league, league, store_root, odds_path, edges, confidences, engine, pricing)
+            for league in leagues
+        ]
+        results = [future.result() for future in futures]
+
+    report = pd.DataFrame([row for rows, _ in results for row in rows])
+    bets = [b for _, b in results if len(b)]
+    return report, (pd.concat(bets, ignore_index=True) if bets else pd.DataFrame())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the value-bet strategy on historical odds')
+    parser.add_argument('--odds', type=str, required=True,
+                       help='Historical odds (CSV or Parquet)')
+    parser.add_argument('--store', type=str, default='data/matches',
+                       help='Match store directory')
+    parser.add_argument('--league', type=str, nargs='+', default=None,
+                       help='Leagues to backtest (default: every league in the store)')
+    parser.add_argument('--edge', type=float, nargs='+', default=[0.05],
+                       help='Minimum EV values to evaluate')
+    parser.add_argument('--confidence', type=float, nargs='+', default=[0.60],
+                       help='Minimum model confidence values to evaluate')
+    parser.add_argument('--engine', type=str, default='analytic', choices=['analytic', 'monte_carlo'],
+                       help='Pricing engine')
+    parser.add_argument('--pricing', type=str, default='dixon_coles', choices=PRICING_METHODS,
+                       help='Goal rates: Dixon-Coles strengths (as the app) or raw form averages')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: one per league, up to the CPU count)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write the report to this CSV')
+    parser.add_argument('--bets', type=str, default=None,
+                       help='Write every settled bet to this CSV')
+
+    args = parser.parse_args()
+
+    store = MatchStore(args.store)
+    if not store.exists():
+        print(f"❌ No match store at {args.store}")
+        return
+
+    leagues = args.league or store.leagues()
+    print(f"⏱️ Backtesting {len(leagues)} leagues...")
+    start = time.perf_counter()
+    report, bets = run_backtest(leagues, args.store, args.odds, args.edge, args.confidence,
+                                args.engine, args.workers, args.pricing)
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s\n")
+
+    if report.empty:
+        print("⚠️ No odds matched any priced fixture")
+        return
+
+    columns = ['league', 'edge', 'confidence', 'bets', 'won', 'lost', 'profit',
+               'roi', 'hit_rate', 'max_drawdown', 'clv']
+    print(report[columns].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"\n💾 Report saved to: {args.output}")
+    if args.bets and len(bets):
+        bets.to_csv(args.bets, index=False)
+        print(f"💾 Bets saved to: {args.bets}")
+
+
+if __name__ == "__main__":
+    main()
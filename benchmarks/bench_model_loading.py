@@ -0,0 +1,93 @@
+"""
+Benchmark cold-start model loading: pickled XGBClassifier vs native booster
+
+Trains one small model per league on random features, saves it both ways
+and times loading all of them, then single-fixture prediction latency
+(sklearn predict_proba vs LeagueModel.predict_proba / inplace_predict).
+Import time is not included: both paths import xgboost.
+
+Usage:
+    python benchmarks/bench_model_loading.py --leagues 9
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from artifacts import load_model, model_path, save_model
+from features import FEATURE_COLUMNS
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark model artifact loading')
+    parser.add_argument('--leagues', type=int, default=9,
+                       help='Models to load')
+    parser.add_argument('--matches', type=int, default=4000,
+                       help='Training rows per model')
+    parser.add_argument('--repeats', type=int, default=100,
+                       help='Predictions timed per model')
+    parser.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    X = pd.DataFrame(rng.uniform(0, 3, size=(args.matches, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = rng.integers(0, 3, size=args.matches)
+    fixture = X.head(1)
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        pickles, boosters = [], []
+        for i in range(args.leagues):
+            model = xgb.XGBClassifier(max_depth=6, n_estimators=200, objective='multi:softprob',
+                                      num_class=3, random_state=i)
+            model.fit(X, y)
+            pickle_file = os.path.join(models_dir, f"league{i}_model.pkl")
+            with open(pickle_file, 'wb') as f:
+                pickle.dump(model, f)
+            pickles.append(pickle_file)
+            boosters.append(save_model(model, model_path(f"league{i}", models_dir),
+                                       {'feature_columns': FEATURE_COLUMNS, 'n_trees': 200}))
+
+        def load_pickle(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+
+        timings = {}
+        for name, loader, paths in [('pickle', load_pickle, pickles), ('ubj', load_model, boosters)]:
+            start = time.perf_counter()
+            models = [loader(path) for path in paths]
+            load_seconds = time.perf_counter() - start
+
+            probs = [model.predict_proba(fixture)[0] for model in models]  # Warm-up
+            start = time.perf_counter()
+            for model in models:
+                for _ in range(args.repeats):
+                    model.predict_proba(fixture)
+            predict_seconds = (time.perf_counter() - start) / (len(models) * args.repeats)
+            timings[name] = (load_seconds, predict_seconds, probs)
+
+        size = {name: sum(os.path.getsize(p) for p in paths) / 1e6
+                for name, paths in [('pickle', pickles), ('ubj', boosters)]}
+
+    print(f"📦 {args.leagues} models, 200 trees each\n")
+    print(f"{'format':<8} {'load all (ms)':>14} {'predict (µs)':>13} {'size (MB)':>10}")
+    for name, (load_seconds, predict_seconds, _) in timings.items():
+        print(f"{name:<8} {load_seconds * 1e3:>14.1f} {predict_seconds * 1e6:>13.1f} {size[name]:>10.2f}")
+    print(f"\nLoad speedup: {timings['pickle'][0] / timings['ubj'][0]:.1f}x, "
+          f"predict speedup: {timings['pickle'][1] / timings['ubj'][1]:.1f}x")
+
+    max_diff = max(np.abs(a - b).max() for a, b in zip(timings['pickle'][2], timings['ubj'][2]))
+    print(f"Max probability difference: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark results-page parser backends on saved fixture HTML
+
+Checks that every backend extracts identical rows, then times each one.
+
+Usage:
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --fixture fixtures/soccerstats/results.asp --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from parsers import PARSERS, get_parser
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                               'fixtures', 'soccerstats', 'results.asp')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark results-page parsers')
+    parser.add_argument('--fixture', type=str, default=DEFAULT_FIXTURE,
+                       help='Saved results page to parse')
+    parser.add_argument('--repeat', type=int, default=20,
+                       help='Parses per backend')
+
+    args = parser.parse_args()
+
+    with open(args.fixture, 'rb') as f:
+        html = f.read()
+
+    print(f"📄 {args.fixture} ({len(html) / 1024:.0f} KB), {args.repeat} parses per backend\n")
+
+    baseline = None
+    timings = {}
+    for name in PARSERS:
+        backend = get_parser(name)
+        rows = backend.parse(html)
+        if baseline is None:
+            baseline = rows
+        elif rows != baseline:
+            raise AssertionError(f"{name} rows differ from {next(iter(PARSERS))}")
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            backend.parse(html)
+        timings[name] = (time.perf_counter() - start) / args.repeat
+
+    reference = timings['bs4']
+    print(f"{'backend':<10} {'rows':>6} {'ms/page':>9} {'speedup':>8}")
+    for name, seconds in timings.items():
+        print(f"{name:<10} {len(baseline):>6} {seconds * 1000:>9.2f} {reference / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark prediction service latency
+
+Builds one synthetic league (random results, a small model on random
+features), then times (league, home, away) requests: one at a time
+through PredictionService.predict, and from N concurrent client threads
+through the micro-batching queue. Reports p50 / p99 latency, throughput
+and the mean batch size.
+
+Usage:
+    python benchmarks/bench_predict_service.py --clients 1 4 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from artifacts import model_path, save_model
+from features import FEATURE_COLUMNS
+from predict_service import PredictionService
+from team_stats import save_team_stats
+
+LEAGUE = 'bench'
+
+
+def synthetic_matches(rng, teams=20, seasons=3):
+    """Double round-robin results for `teams` teams"""
+    names = [f"Team {i}" for i in range(teams)]
+    pairs = [(h, a) for h in names for a in names if h != a]
+    rows = []
+    start = pd.Timestamp('2020-08-01')
+    for season in range(seasons):
+        for k, i in enumerate(rng.permutation(len(pairs))):
+            home, away = pairs[i]
+            rows.append((start + pd.Timedelta(days=season * 365 + k // 10), home, away))
+    matches = pd.DataFrame(rows, columns=['date', 'home_team', 'away_team'])
+    matches['home_goals'] = rng.poisson(1.5, len(matches))
+    matches['away_goals'] = rng.poisson(1.1, len(matches))
+    return matches, names
+
+
+def percentiles(latencies):
+    ms = np.asarray(latencies) * 1e3
+    return np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark prediction service latency')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16],
+                       help='Concurrent client threads to test')
+    parser.add_argument('--requests', type=int, default=2000,
+                       help='Requests per run')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    matches, teams = synthetic_matches(rng)
+    fixtures = [(LEAGUE, teams[i], teams[j]) for i, j in rng.integers(0, len(teams), size=(args.requests, 2))]
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        X = rng.uniform(0, 3, size=(4000, len(FEATURE_COLUMNS)))
+        model = xgb.XGBClassifier(max_depth=6, n_estimators=200, objective='multi:softprob',
+                                  num_class=3, random_state=args.seed)
+        model.fit(X, rng.integers(0, 3, size=len(X)))
+        save_model(model, model_path(LEAGUE, models_dir), {'feature_columns': FEATURE_COLUMNS, 'n_trees': 200})
+        save_team_stats(matches, LEAGUE, models_dir)
+
+        service = PredictionService(models_dir, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+        service.predict(*fixtures[0])  # Load artifacts
+
+        latencies = []
+        start = time.perf_counter()
+        for fixture in fixtures:
+            t = time.perf_counter()
+            service.predict(*fixture)
+            latencies.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+
+        print(f"⚽ {len(fixtures)} requests, 200 trees, max batch {args.max_batch}, "
+              f"max wait {args.max_wait_ms:g} ms\n")
+        print(f"{'mode':<14} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8} {'batch':>6}")
+        p50, p99 = percentiles(latencies)
+        print(f"{'direct':<14} {p50:>9.2f} {p99:>9.2f} {len(fixtures) / elapsed:>8.0f} {1:>6.1f}")
+
+        # Count batches by wrapping predict_many
+        batches = []
+        predict_many = service.predict_many
+        service.predict_many = lambda requests: batches.append(len(requests)) or predict_many(requests)
+
+        for clients in args.clients:
+            latencies, batches[:] = [], []
+            lock = threading.Lock()
+
+            def client(chunk):
+                mine = []
+                for fixture in chunk:
+                    t = time.perf_counter()
+                    service.submit(*fixture).result()
+                    mine.append(time.perf_counter() - t)
+                with lock:
+                    latencies.extend(mine)
+
+            threads = [threading.Thread(target=client, args=(fixtures[k::clients],)) for k in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            p50, p99 = percentiles(latencies)
+            print(f"{f'batched x{clients}':<14} {p50:>9.2f} {p99:>9.2f} "
+                  f"{len(latencies) / elapsed:>8.0f} {np.mean(batches):>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark the analytic goals engine against Monte Carlo
+
+Reports latency per fixture and the Monte Carlo sampling error measured
+against the exact probabilities, then times a full matchday card (goals,
+corners and cards) priced fixture-by-fixture vs one price_fixtures call.
+
+Usage:
+    python benchmarks/bench_pricing.py --fixtures 90
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pricing import (analytic_goal_markets, monte_carlo_simulation, predict_cards,
+                     predict_corners, price_fixtures)
+
+MARKETS = ['over_2_5', 'btts_yes', 'avg_total_goals']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark goals pricing engines')
+    parser.add_argument('--fixtures', type=int, default=90,
+                       help='Random fixtures to price')
+    parser.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    rates = rng.uniform(0.5, 2.5, size=(args.fixtures, 2))
+
+    timings = {}
+    results = {}
+    for name, engine in [('analytic', analytic_goal_markets), ('monte_carlo', monte_carlo_simulation)]:
+        start = time.perf_counter()
+        results[name] = [engine(home, away) for home, away in rates]
+        timings[name] = (time.perf_counter() - start) / args.fixtures
+
+    print(f"⚽ {args.fixtures} fixtures\n")
+    print(f"{'engine':<12} {'µs/fixture':>11}")
+    for name, seconds in timings.items():
+        print(f"{name:<12} {seconds * 1e6:>11.1f}")
+    print(f"\nAnalytic speedup: {timings['monte_carlo'] / timings['analytic']:.1f}x")
+
+    print("\nMonte Carlo error vs exact (max / mean absolute):")
+    for market in MARKETS:
+        errors = np.abs([mc[market] - exact[market]
+                         for mc, exact in zip(results['monte_carlo'], results['analytic'])])
+        print(f"  {market:<16} {errors.max():.4f} / {errors.mean():.4f}")
+
+    # Matchday card: all markets for every fixture
+    corners = rng.uniform(4.0, 7.0, size=(args.fixtures, 2))
+    yellows = rng.uniform(1.5, 2.8, size=(args.fixtures, 2))
+    reds = rng.uniform(0.05, 0.15, size=(args.fixtures, 2))
+
+    start = time.perf_counter()
+    for i in range(args.fixtures):
+        monte_carlo_simulation(rates[i, 0], rates[i, 1])
+        predict_corners(corners[i, 0], corners[i, 1])
+        predict_cards(yellows[i, 0], yellows[i, 1], reds[i, 0], reds[i, 1])
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    card = price_fixtures(rates[:, 0], rates[:, 1], corners[:, 0], corners[:, 1],
+                          yellows[:, 0], yellows[:, 1], reds[:, 0], reds[:, 1])
+    batch_seconds = time.perf_counter() - start
+
+    print(f"\nMatchday card ({args.fixtures} fixtures x {len(card.columns)} markets):")
+    print(f"  per-fixture Monte Carlo  {loop_seconds * 1000:>9.1f} ms")
+    print(f"  price_fixtures analytic  {batch_seconds * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Probability calibration for the 1X2 models
+
+XGBoost's probabilities are sharper or flatter than the observed
+frequencies, and every edge the app reports is model probability times
+odds, so miscalibration shows up directly as false value bets. A
+calibration map is fitted on walk-forward out-of-fold predictions (the
+model never saw those matches) and stored in the model's metadata
+sidecar:
+
+- temperature: p_k proportional to p_k ** (1 / T) * exp(b_k); the
+  per-outcome offsets b let flattening keep the base rates (plain
+  temperature pulls draws toward 1/3)
+- isotonic: a monotone map per outcome, kept as breakpoints
+
+Both are applied with a few array operations (np.interp for isotonic),
+then each row is renormalised to sum to one.
+
+Quality is reported as class-wise expected calibration error (ECE): per
+outcome, the match-weighted gap between mean predicted probability and
+observed frequency over equal-width bins, averaged over the outcomes.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from sklearn.isotonic import IsotonicRegression
+from sklearn.metrics import log_loss
+
+from validation import CLASSES, PROBA_COLUMNS
+
+CALIBRATION_METHODS = ['temperature', 'isotonic']
+OUTCOME_NAMES = ['away_win', 'draw', 'home_win']
+RELIABILITY_BINS = 10
+PROBA_FLOOR = 1e-4       # No outcome is ever priced as impossible
+TEMPERATURE_BOUNDS = (0.25, 4.0)
+OFFSET_BOUNDS = (-2.0, 2.0)
+
+
+class Calibrator:
+    """
+    Fitted calibration map for one league
+
+    State:
+    - method: 'temperature' or 'isotonic'
+    - temperature, offsets: T and per-outcome b (temperature method)
+    - knots: per outcome, (x, y) breakpoints of the isotonic map
+    - info: fit diagnostics (matches, ECE, ...), saved with the map
+    """
+
+    def __init__(self, method, temperature=1.0, offsets=(0.0, 0.0, 0.0), knots=None, info=None):
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(f"Unknown calibration method: {method}")
+        self.method = method
+        self.temperature = float(temperature)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.knots = [(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+                      for x, y in (knots or [])]
+        self.info = info or {}
+
+    def apply(self, proba):
+        """Calibrated (N, 3) probabilities for raw (N, 3) probabilities"""
+        proba = np.asarray(proba, dtype=np.float64)
+        if self.method == 'temperature':
+            out = np.exp(np.log(np.maximum(proba, PROBA_FLOOR)) / self.temperature + self.offsets)
+        else:
+            out = np.column_stack([np.interp(proba[:, k], x, y) for k, (x, y) in enumerate(self.knots)])
+            out = np.maximum(out, PROBA_FLOOR)
+        return out / out.sum(axis=1, keepdims=True)
+
+    def to_dict(self):
+        """JSON-serialisable form for the model metadata"""
+        data = {'method': self.method, 'info': self.info}
+        if self.method == 'temperature':
+            data.update(temperature=self.temperature, offsets=self.offsets.tolist())
+        else:
+            data['knots'] = [[x.tolist(), y.tolist()] for x, y in self.knots]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['method'], data.get('temperature', 1.0), data.get('offsets', (0.0, 0.0, 0.0)),
+                   data.get('knots'), data.get('info'))
+
+
+def fit_calibrator(proba, y, method='temperature'):
+    """
+    Fit a calibration map
+
+    Args:
+        proba: (N, 3) out-of-fold probabilities (Away Win, Draw, Home Win)
+        y: outcome per row (0, 1, 2)
+        method: 'temperature' or 'isotonic' (needs more matches to beat temperature)
+    """
+    proba = np.asarray(proba, dtype=np.float64)
+    y = np.asarray(y, dtype=np.int64)
+
+    if method == 'temperature':
+        log_p = np.log(np.maximum(proba, PROBA_FLOOR))
+        onehot = np.eye(len(CLASSES))[y]
+
+        def loss(params):
+            # params = [log T, b_draw, b_home]; the away offset is pinned at 0
+            inv_t = np.exp(-params[0])
+            offsets = np.r_[0.0, params[1:]]
+            scaled = log_p * inv_t + offsets
+            scaled -= scaled.max(axis=1, keepdims=True)
+            p = np.exp(scaled)
+            p /= p.sum(axis=1, keepdims=True)
+            residual = p - onehot
+            grad = np.r_[-inv_t * np.sum(residual * log_p), residual[:, 1:].sum(axis=0)] / len(y)
+            return float(-np.mean(np.log(p[np.arange(len(y)), y]))), grad
+
+        bounds = [tuple(np.log(TEMPERATURE_BOUNDS))] + [OFFSET_BOUNDS] * 2
+        result = minimize(loss, np.zeros(3), jac=True, method='L-BFGS-B', bounds=bounds)
+        return Calibrator('temperature', temperature=np.exp(result.x[0]), offsets=np.r_[0.0, result.x[1:]],
+                          info={'matches': len(y)})
+
+    if method != 'isotonic':
+        raise ValueError(f"Unknown calibration method: {method}")
+    knots = []
+    for k in CLASSES:
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        iso.fit(proba[:, k], (y == k).astype(np.float64))
+        knots.append((iso.X_thresholds_, iso.y_thresholds_))
+    return Calibrator('isotonic', knots=knots, info={'matches': len(y)})
+
+
+def reliability_table(y, proba, bins=RELIABILITY_BINS):
+    """
+    Reliability diagram data: one row per (outcome, probability bin) with matches
+
+    Columns: outcome, bin_low, bin_high, matches, predicted (mean
+    probability) and observed (outcome frequency).
+    """
+    proba = np.asarray(proba, dtype=np.float64)
+    y = np.asarray(y, dtype=np.int64)
+    edges = np.linspace(0, 1, bins + 1)
+
+    tables = []
+    for k, name in zip(CLASSES, OUTCOME_NAMES):
+        bin_idx = np.clip(np.digitize(proba[:, k], edges[1:-1]), 0, bins - 1)
+        matches = np.bincount(bin_idx, minlength=bins)
+        predicted = np.bincount(bin_idx, proba[:, k], minlength=bins)
+        observed = np.bincount(bin_idx, (y == k).astype(np.float64), minlength=bins)
+        used = matches > 0
+        tables.append(pd.DataFrame({
+            'outcome': name,
+            'bin_low': edges[:-1][used],
+            'bin_high': edges[1:][used],
+            'matches': matches[used],
+            'predicted': predicted[used] / matches[used],
+            'observed': observed[used] / matches[used],
+        }))
+    return pd.concat(tables, ignore_index=True)
+
+
+def expected_calibration_error(y, proba, bins=RELIABILITY_BINS):
+    """Class-wise ECE: per outcome, match-weighted |observed - predicted| over bins, averaged"""
+    table = reliability_table(y, proba, bins)
+    gap = (table['observed'] - table['predicted']).abs() * table['matches']
+    return float(gap.sum() / (len(y) * len(CLASSES))) if len(y) else float('nan')
+
+
+def calibration_report(oof, method='temperature', bins=RELIABILITY_BINS):
+    """
+    Raw vs calibrated quality on out-of-fold predictions, kept honest
+
+    The map applied to each fold is fitted on the earlier folds only
+    (walk-forward again), so the calibrated figures are out of sample.
+    The first fold has nothing to fit on and is scored raw on both sides.
+
+    Args:
+        oof: walk_forward_validate output (PROBA_COLUMNS, result, fold)
+
+    Returns:
+        dict with matches, ece_raw, ece_calibrated, log_loss_raw,
+        log_loss_calibrated and the raw / calibrated reliability tables
+    """
+    proba = oof[PROBA_COLUMNS].to_numpy(dtype=np.float64)
+    proba = proba / proba.sum(axis=1, keepdims=True)  # float32 model output only sums to ~1
+    y = oof['result'].to_numpy(dtype=np.int64)
+    folds = oof['fold'].to_numpy()
+
+    calibrated = proba.copy()
+    seen = np.zeros(len(oof), dtype=bool)
+    for name in pd.unique(folds):
+        rows = folds == name
+        if seen.any():
+            calibrated[rows] = fit_calibrator(proba[seen], y[seen], method).apply(proba[rows])
+        seen |= rows
+
+    return {
+        'matches': len(y),
+        'ece_raw': expected_calibration_error(y, proba, bins),
+        'ece_calibrated': expected_calibration_error(y, calibrated, bins),
+        'log_loss_raw': log_loss(y, proba, labels=CLASSES),
+        'log_loss_calibrated': log_loss(y, calibrated, labels=CLASSES),
+        'reliability_raw': reliability_table(y, proba, bins),
+        'reliability_calibrated': reliability_table(y, calibrated, bins),
+    }
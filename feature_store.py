@@ -0,0 +1,150 @@
+"""
+Incremental feature store
+
+Persists engineered features per league together with the rolling state
+of RollingFeatureEngine at the last processed date. A retrain only runs
+the engine over matches that are not in the store yet and appends their
+rows, instead of rebuilding the full history.
+
+Layout:
+    data/features/{league}/features.csv   keys + features + result
+    data/features/{league}/state.pkl      engine state, processed keys with
+                                          their goals, expected CSV size
+"""
+
+import os
+import pickle
+
+import pandas as pd
+
+from atomic import atomic_write
+from features import RollingFeatureEngine, match_result
+
+KEY_COLUMNS = ['league', 'date', 'home_team', 'away_team']
+
+
+class FeatureStore:
+    def __init__(self, league, store_dir='data/features', window=5, extra_windows=(), ewm_halflives=(),
+                 venue_split=False):
+        self.league = league
+        self.config = {'window': window, 'extra_windows': list(extra_windows),
+                       'ewm_halflives': list(ewm_halflives), 'venue_split': venue_split}
+        self.path = os.path.join(store_dir, league)
+        self.features_file = os.path.join(self.path, 'features.csv')
+        self.state_file = os.path.join(self.path, 'state.pkl')
+
+    def _load_state(self):
+        if not (os.path.isfile(self.state_file) and os.path.isfile(self.features_file)):
+            return None
+        with open(self.state_file, 'rb') as f:
+            state = pickle.load(f)
+        if state['engine'].config != self.config:
+            return None
+        # The state is saved before the CSV is written; a size mismatch
+        # means the write after it never finished (or an older layout)
+        if state.get('features_bytes') != os.path.getsize(self.features_file):
+            return None
+        return state
+
+    def _save_state(self, state):
+        with atomic_write(self.state_file) as f:
+            pickle.dump(state, f)
+
+    @staticmethod
+    def _match_keys(df):
+        """{(date, home_team, away_team): (home_goals, away_goals)}"""
+        return dict(zip(zip(df['date'], df['home_team'], df['away_team']),
+                        zip(df['home_goals'], df['away_goals'])))
+
+    def _prepare(self, df):
+        """Normalise keys and order matches the way the engine expects"""
+        df = df.copy()
+        if 'league' not in df.columns:
+            df['league'] = self.league
+        df = df[df['league'] == self.league]
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df = df.dropna(subset=['date', 'home_goals', 'away_goals'])
+        df = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+        return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+    def _build_rows(self, engine, df):
+        rows = []
+        for league, date, home_team, away_team, home_goals, away_goals in zip(
+            df['league'], df['date'], df['home_team'], df['away_team'],
+            df['home_goals'], df['away_goals']
+        ):
+            engine.advance_to(date)
+            features = engine.features_for(home_team, away_team)
+            engine.update(date, home_team, away_team, home_goals, away_goals)
+
+            row = {'league': league, 'date': date, 'home_team': home_team, 'away_team': away_team}
+            row.update(features)
+            row['result'] = match_result(home_goals, away_goals)
+            rows.append(row)
+        return pd.DataFrame(rows, columns=KEY_COLUMNS + engine.columns + ['result'])
+
+    def rebuild(self, df):
+        """Recompute every feature row from scratch"""
+        df = self._prepare(df)
+        engine = RollingFeatureEngine(**self.config)
+        feature_df = self._build_rows(engine, df)
+        data = feature_df.to_csv(index=False).encode()
+
+        self._save_state({
+            'engine': engine,
+            'keys': self._match_keys(df),
+            'features_bytes': len(data),
+        })
+        with atomic_write(self.features_file) as f:
+            f.write(data)
+        return len(feature_df)
+
+    def update(self, df):
+        """
+        Append features for matches not yet in the store
+
+        Matches dated before the stored state (late results) and stored
+        matches whose score changed (corrections) can't be slotted into
+        the rolling buffers, so they trigger a full rebuild instead.
+
+        Returns:
+            Number of feature rows computed
+        """
+        state = self._load_state()
+        if state is None:
+            print(f"🗄️ No feature store for {self.league}, building from scratch...")
+            return self.rebuild(df)
+
+        df = self._prepare(df)
+        keys = list(zip(df['date'], df['home_team'], df['away_team']))
+        goals = zip(df['home_goals'], df['away_goals'])
+        stored = state['keys']
+        if any(stored.get(key, score) != score for key, score in zip(keys, goals)):
+            print(f"⚠️ {self.league}: corrected scores for stored matches, rebuilding...")
+            return self.rebuild(df)
+
+        is_new = pd.Series([key not in stored for key in keys], index=df.index, dtype=bool)
+        new_matches = df[is_new]
+
+        if new_matches.empty:
+            return 0
+
+        engine = state['engine']
+        if engine.current_date is not None and new_matches['date'].min() < engine.current_date:
+            print(f"⚠️ {self.league}: matches older than {engine.current_date.date()} arrived, rebuilding...")
+            return self.rebuild(df)
+
+        feature_df = self._build_rows(engine, new_matches)
+        data = feature_df.to_csv(header=False, index=False).encode()
+
+        stored.update(self._match_keys(new_matches))
+        state['features_bytes'] += len(data)
+        self._save_state(state)
+        with open(self.features_file, 'ab') as f:
+            f.write(data)
+        return len(feature_df)
+
+    def load(self):
+        """All stored feature rows in chronological order"""
+        feature_df = pd.read_csv(self.features_file, parse_dates=['date'])
+        return feature_df.sort_values('date', kind='stable').reset_index(drop=True)
@@ -0,0 +1,86 @@
+"""
+On-disk HTTP response cache for the scrapers
+
+Entries are keyed by URL and store the body plus ETag/Last-Modified so
+later fetches can be conditional GETs. Entries marked immutable (pages for
+completed seasons) are served straight from disk and never re-requested.
+
+Layout:
+    data/http_cache/<sha256(url)>.body
+    data/http_cache/<sha256(url)>.json   url, etag, last_modified, immutable, fetched_at
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class ResponseCache:
+    def __init__(self, cache_dir='data/http_cache'):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0           # served from disk without a request
+        self.revalidated = 0    # conditional GET answered 304 Not Modified
+        self.misses = 0         # body downloaded
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.body', base + '.json'
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def lookup(self, url):
+        """Cached (meta, body) for a URL, or None"""
+        body_path, meta_path = self._paths(url)
+        if not (os.path.isfile(body_path) and os.path.isfile(meta_path)):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return meta, body
+
+    def store(self, url, response, immutable=False):
+        """Save a 200 response"""
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'immutable': immutable,
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._write_atomic(body_path, response.content)
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def mark_immutable(self, url):
+        """Flag an existing entry as never needing revalidation"""
+        cached = self.lookup(url)
+        if cached is None or cached[0]['immutable']:
+            return
+        meta = dict(cached[0], immutable=True)
+        self._write_atomic(self._paths(url)[1], json.dumps(meta).encode('utf-8'))
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def summary(self):
+        return (f"💾 HTTP cache: {self.hits} hits, {self.revalidated} revalidated (304), "
+                f"{self.misses} misses")
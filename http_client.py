@@ -0,0 +1,170 @@
+"""
+Polite concurrent HTTP fetching for the scrapers
+
+- One pooled requests.Session shared by all worker threads (keep-alive,
+  no new TCP/TLS handshake per page)
+- Token-bucket rate limit per host instead of a blanket sleep, so pages
+  for several leagues/seasons are fetched concurrently without exceeding
+  the allowed request rate
+- Optional ResponseCache: conditional GETs, and no request at all for
+  pages marked immutable
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Args:
+        rate: tokens added per second (sustained requests/second)
+        capacity: maximum burst size
+    """
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response when a page comes from the cache"""
+
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, url, content):
+        self.url = url
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+class PoliteFetcher:
+    """
+    Pooled, per-host rate-limited fetcher
+
+    Args:
+        headers: default request headers
+        rate: requests/second allowed per host
+        burst: requests allowed back-to-back per host
+        max_workers: concurrent requests in flight
+        timeout: per-request timeout in seconds
+        cache: optional ResponseCache
+    """
+
+    def __init__(self, headers=None, rate=0.5, burst=1, max_workers=4, timeout=30, cache=None):
+        self.cache = cache
+        self.rate = rate
+        self.burst = burst
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def get(self, url, headers=None, immutable=False):
+        """
+        Rate-limited GET (raises for HTTP errors)
+
+        With a cache, immutable entries are returned without a request and
+        other entries are revalidated with a conditional GET. Pass
+        immutable=True for pages that will never change again.
+        """
+        cached = None
+        headers = dict(headers or {})
+        if self.cache is not None:
+            cached = self.cache.lookup(url)
+            if cached is not None:
+                meta, body = cached
+                if meta['immutable']:
+                    self.cache.record('hits')
+                    return CachedResponse(url, body)
+                headers.update(self.cache.conditional_headers(meta))
+
+        self._bucket(url).acquire()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.record('revalidated')
+            if immutable:
+                self.cache.mark_immutable(url)
+            return CachedResponse(url, cached[1])
+
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.store(url, response, immutable=immutable)
+            self.cache.record('misses')
+        return response
+
+    def fetch_all(self, urls, immutable=()):
+        """
+        Fetch many URLs concurrently
+
+        Args:
+            urls: URLs to fetch
+            immutable: subset of URLs whose content will never change
+
+        Returns:
+            dict url -> response, or the exception raised for that URL
+        """
+        urls = list(dict.fromkeys(urls))
+        immutable = set(immutable)
+        results = {}
+
+        def fetch(url):
+            try:
+                return self.get(url, immutable=url in immutable)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for url, result in zip(urls, pool.map(fetch, urls)):
+                results[url] = result
+        return results
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,32 @@
+"""
+League registry shared by the scraper, trainer and app
+
+Keys are the league names used in file paths and on the command line
+(data/matches/league=<key>, models/<key>_model.ubj).
+"""
+
+# SoccerStats.com league codes (verify on the actual site)
+LEAGUE_CODES = {
+    'seria_a': 'italy1',
+    'serie_b': 'italy2',
+    'laliga': 'spain1',
+    'laliga_2': 'spain2',
+    'premier_league': 'england',
+    'bundesliga': 'germany',
+    'bundesliga_2': 'germany2',
+    'j1_league': 'japan',
+    'swiss_super_league': 'switzerland',
+}
+
+# App display names -> league keys
+APP_LEAGUE_KEYS = {
+    "🇮🇹 Serie A": 'seria_a',
+    "🇮🇹 Serie B": 'serie_b',
+    "🇪🇸 La Liga": 'laliga',
+    "🇪🇸 La Liga 2": 'laliga_2',
+    "🏴󠁧󠁢󠁥󠁮󠁧󠁿 Premier League": 'premier_league',
+    "🇩🇪 Bundesliga": 'bundesliga',
+    "🇩🇪 2. Bundesliga": 'bundesliga_2',
+    "🇯🇵 J1 League": 'j1_league',
+    "🇨🇭 Swiss Super League": 'swiss_super_league',
+}
@@ -0,0 +1,270 @@
+"""
+Bet ledger
+
+SQLite database in WAL mode replacing betting_tracker.csv. Every insert
+is its own transaction, so concurrent app sessions never interleave
+rows, and readers are not blocked by writers. Bet counts, stakes and P/L
+per result are kept in a totals table by triggers, so the history
+summary never scans the bets.
+
+Usage:
+    python ledger.py --migrate betting_tracker.csv
+    python ledger.py                               # print totals
+"""
+
+import argparse
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+RESULTS = ['Pending', 'Won', 'Lost', 'Void']
+
+# Database column -> betting_tracker.csv column
+CSV_COLUMNS = {
+    'date': 'Date',
+    'match': 'Match',
+    'home_team': 'Home_Team',
+    'away_team': 'Away_Team',
+    'bet_type': 'Bet_Type',
+    'odds': 'Odds',
+    'stake': 'Stake',
+    'potential_return': 'Potential_Return',
+    'result': 'Result',
+    'profit_loss': 'Profit_Loss',
+    'logged_at': 'Logged_At',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bets (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    match TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    bet_type TEXT NOT NULL,
+    odds REAL NOT NULL,
+    stake REAL NOT NULL DEFAULT 0,
+    potential_return REAL NOT NULL DEFAULT 0,
+    result TEXT NOT NULL DEFAULT 'Pending',
+    profit_loss REAL NOT NULL DEFAULT 0,
+    logged_at TEXT NOT NULL,
+    settled_at TEXT
+);
+CREATE INDEX IF NOT EXISTS bets_result ON bets (result);
+CREATE INDEX IF NOT EXISTS bets_fixture ON bets (date, home_team, away_team);
+
+CREATE TABLE IF NOT EXISTS totals (
+    result TEXT PRIMARY KEY,
+    bets INTEGER NOT NULL DEFAULT 0,
+    stake REAL NOT NULL DEFAULT 0,
+    profit_loss REAL NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS bets_insert AFTER INSERT ON bets BEGIN
+    INSERT OR IGNORE INTO totals (result) VALUES (NEW.result);
+    UPDATE totals SET bets = bets + 1, stake = stake + NEW.stake,
+        profit_loss = profit_loss + NEW.profit_loss
+    WHERE result = NEW.result;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bets_update AFTER UPDATE OF result, stake, profit_loss ON bets BEGIN
+    UPDATE totals SET bets = bets - 1, stake = stake - OLD.stake,
+        profit_loss = profit_loss - OLD.profit_loss
+    WHERE result = OLD.result;
+    INSERT OR IGNORE INTO totals (result) VALUES (NEW.result);
+    UPDATE totals SET bets = bets + 1, stake = stake + NEW.stake,
+        profit_loss = profit_loss + NEW.profit_loss
+    WHERE result = NEW.result;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bets_delete AFTER DELETE ON bets BEGIN
+    UPDATE totals SET bets = bets - 1, stake = stake - OLD.stake,
+        profit_loss = profit_loss - OLD.profit_loss
+    WHERE result = OLD.result;
+END;
+
+CREATE TABLE IF NOT EXISTS migrations (
+    source TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    migrated_at TEXT NOT NULL
+);
+"""
+
+INSERT_BET = f"""
+INSERT INTO bets ({', '.join(CSV_COLUMNS)})
+VALUES ({', '.join('?' for _ in CSV_COLUMNS)})
+"""
+
+
+def _ledger_rows(bets, source):
+    """betting_tracker.csv rows -> INSERT_BET parameter tuples"""
+    bets = bets.rename(columns={csv: col for col, csv in CSV_COLUMNS.items()})
+    required = ['date', 'home_team', 'away_team', 'bet_type', 'odds']
+    missing = [CSV_COLUMNS[col] for col in required if col not in bets.columns]
+    if missing:
+        raise ValueError(f"{source} is missing columns: {missing}")
+
+    defaults = {'stake': 0.0, 'potential_return': 0.0, 'result': 'Pending',
+                'profit_loss': 0.0, 'logged_at': ''}
+    for col, value in defaults.items():
+        bets[col] = bets[col].fillna(value) if col in bets.columns else value
+    if 'match' not in bets.columns:
+        bets['match'] = bets['home_team'] + ' vs ' + bets['away_team']
+    bets['date'] = bets['date'].astype(str)
+    return list(bets[list(CSV_COLUMNS)].astype(object).itertuples(index=False, name=None))
+
+
+class BetLedger:
+    """
+    SQLite bet ledger
+
+    Opens a short-lived connection per call, so one instance can be
+    shared by every thread of the app server.
+    """
+
+    def __init__(self, path='data/ledger.db', timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def add_bet(self, date, home_team, away_team, bet_type, odds, stake=0):
+        """Append one pending bet and return it with betting_tracker.csv keys"""
+        bet = {
+            'date': str(date),
+            'match': f"{home_team} vs {away_team}",
+            'home_team': home_team,
+            'away_team': away_team,
+            'bet_type': bet_type,
+            'odds': float(odds),
+            'stake': float(stake),
+            'potential_return': stake * odds if stake > 0 else 0,
+            'result': 'Pending',
+            'profit_loss': 0.0,
+            'logged_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with closing(self._connect()) as conn, conn:
+            conn.execute(INSERT_BET, [bet[col] for col in CSV_COLUMNS])
+        return {CSV_COLUMNS[col]: value for col, value in bet.items()}
+
+    def history(self, result=None, limit=None):
+        """Bets as a DataFrame with betting_tracker.csv columns, newest first"""
+        query = f"SELECT {', '.join(CSV_COLUMNS)} FROM bets"
+        params = []
+        if result is not None:
+            query += " WHERE result = ?"
+            params.append(result)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+        return df.rename(columns=CSV_COLUMNS)
+
+    def pending(self):
+        """Unsettled bets (id plus the columns settlement needs)"""
+        query = ("SELECT id, date, home_team, away_team, bet_type, odds, stake "
+                 "FROM bets WHERE result = 'Pending' ORDER BY id")
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(query, conn)
+
+    def settle(self, settled):
+        """
+        Write results for many bets in one transaction
+
+        Args:
+            settled: DataFrame with id, result, profit_loss
+
+        Bets settled in the meantime by someone else are left alone.
+        Returns the number of bets updated.
+        """
+        settled_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = zip(settled['result'], settled['profit_loss'].astype(float),
+                   [settled_at] * len(settled), settled['id'].astype(int))
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.executemany(
+                "UPDATE bets SET result = ?, profit_loss = ?, settled_at = ? "
+                "WHERE id = ? AND result = 'Pending'",
+                rows,
+            )
+            return cursor.rowcount
+
+    def totals(self):
+        """Per-result bets/stake/P&L plus overall counts, from the totals table"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT result, bets, stake, profit_loss FROM totals").fetchall()
+
+        by_result = {result: {'bets': 0, 'stake': 0.0, 'profit_loss': 0.0} for result in RESULTS}
+        for result, bets, stake, profit_loss in rows:
+            by_result[result] = {'bets': bets, 'stake': stake, 'profit_loss': profit_loss}
+
+        return {
+            'total_bets': sum(r['bets'] for r in by_result.values()),
+            'pending': by_result['Pending']['bets'],
+            'won': by_result['Won']['bets'],
+            'lost': by_result['Lost']['bets'],
+            'profit_loss': sum(r['profit_loss'] for r in by_result.values()),
+            'by_result': by_result,
+        }
+
+    def migrate_csv(self, csv_file='betting_tracker.csv'):
+        """
+        One-time import of betting_tracker.csv
+
+        Returns the number of rows imported (0 if the file was imported before).
+        """
+        source = os.path.abspath(csv_file)
+        with closing(self._connect()) as conn:
+            done = conn.execute("SELECT rows FROM migrations WHERE source = ?", (source,)).fetchone()
+        if done is not None:
+            return 0
+
+        bets = pd.read_csv(csv_file)
+        rows = _ledger_rows(bets, csv_file)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(INSERT_BET, rows)
+            conn.execute(
+                "INSERT INTO migrations (source, rows, migrated_at) VALUES (?, ?, ?)",
+                (source, len(rows), datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            )
+        return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the bet ledger')
+    parser.add_argument('--db', type=str, default='data/ledger.db',
+                       help='Ledger database file')
+    parser.add_argument('--migrate', type=str, metavar='CSV',
+                       help='Import an existing betting_tracker.csv')
+
+    args = parser.parse_args()
+
+    ledger = BetLedger(args.db)
+
+    if args.migrate:
+        count = ledger.migrate_csv(args.migrate)
+        if count:
+            print(f"✅ Imported {count} bets from {args.migrate}")
+        else:
+            print(f"ℹ️ {args.migrate} was already imported")
+
+    totals = ledger.totals()
+    print(f"📒 {args.db}: {totals['total_bets']} bets "
+          f"({totals['pending']} pending, {totals['won']} won, {totals['lost']} lost), "
+          f"P/L {totals['profit_loss']:+.2f} units")
+
+
+if __name__ == "__main__":
+    main()
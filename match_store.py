@@ -0,0 +1,160 @@
+"""
+Columnar match store
+
+Parquet dataset partitioned by league and season:
+
+    data/matches/league=seria_a/season=2023%2F2024/part-0.parquet
+
+Dates are stored as native timestamps and team names as dictionary
+(categorical) columns, so loading never re-parses strings. Reads use
+column projection, partition pruning on league/season and memory-mapped
+files.
+
+Usage:
+    python match_store.py --migrate data/raw
+"""
+
+import argparse
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+MATCH_COLUMNS = ['date', 'home_team', 'away_team', 'home_goals', 'away_goals', 'season', 'league']
+KEY_COLUMNS = ['league', 'date', 'home_team', 'away_team']
+PARTITION_COLUMNS = ['league', 'season']
+
+
+class MatchStore:
+    def __init__(self, root='data/matches'):
+        self.root = root
+
+    def exists(self):
+        return os.path.isdir(self.root) and bool(glob.glob(os.path.join(self.root, 'league=*')))
+
+    def _normalise(self, df):
+        """Coerce scraped/CSV data into the store's typed schema"""
+        missing = [c for c in MATCH_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Match data is missing columns: {missing}")
+
+        df = df.copy()
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df = df.dropna(subset=['date', 'home_goals', 'away_goals'])
+        df['home_goals'] = df['home_goals'].astype('int64')
+        df['away_goals'] = df['away_goals'].astype('int64')
+        df['season'] = df['season'].astype(str)
+        df['league'] = df['league'].astype(str)
+
+        # Shared team dictionary for both columns
+        teams = sorted(set(df['home_team'].astype(str)) | set(df['away_team'].astype(str)))
+        df['home_team'] = pd.Categorical(df['home_team'].astype(str), categories=teams)
+        df['away_team'] = pd.Categorical(df['away_team'].astype(str), categories=teams)
+
+        df = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+        return df.sort_values(['league', 'date'], kind='stable').reset_index(drop=True)
+
+    def write(self, df):
+        """
+        Write matches, replacing the league/season partitions they cover
+
+        Scrapes always return whole seasons, so a partition is rewritten
+        rather than appended to.
+        """
+        df = self._normalise(df)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        ds.write_dataset(
+            table,
+            self.root,
+            format='parquet',
+            partitioning=ds.partitioning(
+                pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor='hive'
+            ),
+            basename_template='part-{i}.parquet',
+            existing_data_behavior='delete_matching',
+        )
+        return len(df)
+
+    def read(self, league=None, seasons=None, columns=None):
+        """
+        Load matches with partition pruning and column projection
+
+        Args:
+            league: league key to load (None for all leagues)
+            seasons: iterable of season labels, e.g. ['2023/2024'] (None for all)
+            columns: columns to load (default: MATCH_COLUMNS)
+        """
+        filters = []
+        if league is not None:
+            filters.append(('league', '=', league))
+        if seasons is not None:
+            filters.append(('season', 'in', list(seasons)))
+
+        table = pq.read_table(
+            self.root,
+            columns=columns or MATCH_COLUMNS,
+            filters=filters or None,
+            memory_map=True,
+            partitioning='hive',
+        )
+        df = table.to_pandas()
+        for col in ('league', 'season'):
+            if col in df.columns:
+                df[col] = df[col].astype(str)
+        if 'date' in df.columns:
+            df = df.sort_values('date', kind='stable').reset_index(drop=True)
+        return df
+
+    def leagues(self):
+        """League keys present in the store"""
+        dirs = glob.glob(os.path.join(self.root, 'league=*'))
+        return sorted(os.path.basename(d).split('=', 1)[1] for d in dirs)
+
+
+def migrate_csv(raw_dir='data/raw', store_root='data/matches'):
+    """One-time import of the date-stamped CSV files written by older scrapers"""
+    files = sorted(glob.glob(os.path.join(raw_dir, '*.csv')))
+    if not files:
+        print(f"❌ No CSV files found in {raw_dir}")
+        return 0
+
+    frames = []
+    for filepath in files:
+        df = pd.read_csv(filepath)
+        if 'league' not in df.columns:
+            # Files are named {league}_{YYYYMMDD}.csv
+            df['league'] = os.path.basename(filepath).rsplit('_', 1)[0]
+        frames.append(df)
+        print(f"📂 {filepath}: {len(df)} matches")
+
+    # Later files win when the same match was scraped more than once
+    count = MatchStore(store_root).write(pd.concat(frames, ignore_index=True))
+    print(f"✅ Migrated {count} matches into {store_root}")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the Parquet match store')
+    parser.add_argument('--migrate', type=str, metavar='RAW_DIR',
+                       help='Import CSV files from RAW_DIR (e.g. data/raw)')
+    parser.add_argument('--store', type=str, default='data/matches',
+                       help='Match store directory')
+
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate_csv(args.migrate, args.store)
+
+    store = MatchStore(args.store)
+    if store.exists():
+        for league in store.leagues():
+            df = store.read(league=league, columns=['date', 'season'])
+            print(f"  {league}: {len(df)} matches, seasons {sorted(df['season'].unique())}")
+
+
+if __name__ == "__main__":
+    main()
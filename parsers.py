@@ -0,0 +1,119 @@
+"""
+Pluggable parsers for SoccerStats results pages
+
+Every backend returns the same rows:
+    {'date', 'home_team', 'away_team', 'home_goals', 'away_goals'}
+
+Backends:
+- bs4: full BeautifulSoup tree with html.parser (original scraper path)
+- strainer: BeautifulSoup restricted to match tables with a SoupStrainer
+- lxml: lxml.html + XPath over the match rows only (fastest)
+
+All three agree on fixtures/soccerstats/results.asp. That page is
+hand-built in the assumed layout, so the selectors themselves are still
+unverified against the live site: tables with class "matches"
+(MATCH_TABLE_CLASS), a header row, then rows of at least MIN_CELLS cells
+in the order date, home, score, away.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+import lxml.html
+
+SCORE_RE = re.compile(r'\s*(\d+)\s*-\s*(\d+)\s*')
+
+MATCH_TABLE_CLASS = 'matches'
+MIN_CELLS = 5  # date, home, score, away, HT in the assumed layout
+
+
+def parse_score(score):
+    """'2-1' / '2 - 1' -> (2, 1); None for postponed or unplayed matches"""
+    m = SCORE_RE.fullmatch(score)
+    if m is None:
+        return None
+    return int(m.group(1)), int(m.group(2))
+
+
+def _row(cells):
+    """Build a match row from stripped cell texts (None if not a result)"""
+    if len(cells) < MIN_CELLS:
+        return None
+    score = parse_score(cells[2])
+    if score is None:
+        return None
+    return {
+        'date': cells[0],
+        'home_team': cells[1],
+        'away_team': cells[3],
+        'home_goals': score[0],
+        'away_goals': score[1],
+    }
+
+
+class BeautifulSoupParser:
+    """Original path: full tree, find_all over tables/rows/cells"""
+
+    name = 'bs4'
+
+    def _soup(self, html):
+        return BeautifulSoup(html, 'html.parser')
+
+    def parse(self, html):
+        soup = self._soup(html)
+        matches = []
+        for table in soup.find_all('table', class_=MATCH_TABLE_CLASS):
+            for tr in table.find_all('tr')[1:]:  # Skip header
+                row = _row([td.text.strip() for td in tr.find_all('td')])
+                if row is not None:
+                    matches.append(row)
+        return matches
+
+
+class StrainerParser(BeautifulSoupParser):
+    """BeautifulSoup that only builds the match tables (lxml tree builder)"""
+
+    name = 'strainer'
+
+    def _soup(self, html):
+        only_tables = SoupStrainer('table', class_=MATCH_TABLE_CLASS)
+        return BeautifulSoup(html, 'lxml', parse_only=only_tables)
+
+
+class LxmlParser:
+    """lxml.html tree with XPath straight to the match rows"""
+
+    name = 'lxml'
+
+    TABLES = etree.XPath(
+        f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {MATCH_TABLE_CLASS} ')]"
+    )
+    ROWS = etree.XPath('.//tr')
+    CELLS = etree.XPath('.//td')
+
+    def parse(self, html):
+        if not html:
+            return []
+        root = lxml.html.fromstring(html)
+        matches = []
+        for table in self.TABLES(root):
+            for tr in self.ROWS(table)[1:]:  # Skip header
+                row = _row([td.text_content().strip() for td in self.CELLS(tr)])
+                if row is not None:
+                    matches.append(row)
+        return matches
+
+
+PARSERS = {
+    'bs4': BeautifulSoupParser,
+    'strainer': StrainerParser,
+    'lxml': LxmlParser,
+}
+
+
+def get_parser(name='lxml'):
+    parser_cls = PARSERS.get(name)
+    if parser_cls is None:
+        raise ValueError(f"Unknown parser: {name} (choose from {', '.join(PARSERS)})")
+    return parser_cls()
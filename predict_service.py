@@ -0,0 +1,281 @@
+"""
+1X2 prediction service
+
+Serves the trained league models in-process or over local HTTP. For a
+(league, home, away) request the model's features are assembled from
+the league's feature state (team form and head-to-head buffers, built
+with the team-stats snapshot) plus the Elo ratings when the model was
+trained with them, and the cached booster returns Away / Draw / Home
+probabilities.
+
+Concurrent requests are micro-batched: a worker thread takes every
+request already queued (up to `max_batch`) and scores each league's
+requests with a single predict call. Requests that arrive while a batch
+is being scored form the next one, so batches grow with load and a lone
+request never waits. `max_wait_ms` additionally holds a batch open to
+let it fill (trading latency for throughput).
+
+Usage:
+    python predict_service.py --league seria_a --home Napoli --away Inter
+    python predict_service.py --serve --port 8000
+
+    curl 'localhost:8000/predict?league=seria_a&home=Napoli&away=Inter'
+    curl -X POST localhost:8000/predict -d '[{"league": "seria_a", "home": "Napoli", "away": "Inter"}]'
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from artifacts import artifact_versions, load_feature_state, load_model, load_ratings, load_team_stats
+from leagues import LEAGUE_CODES
+
+OUTCOMES = ['away_win', 'draw', 'home_win']
+SERVICE_ARTIFACTS = ['model', 'team_stats', 'feature_state']
+OPTIONAL_ARTIFACTS = ['ratings']
+
+
+class PredictionService:
+    """
+    Cached models + feature state per league, with a micro-batching queue
+
+    Artifacts are reloaded when their files change on disk (checked at
+    most every `reload_interval` seconds per league).
+    """
+
+    def __init__(self, models_dir='models', max_batch=64, max_wait_ms=0.0, reload_interval=1.0):
+        self.models_dir = models_dir
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.reload_interval = reload_interval
+        self._leagues = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+
+    # Artifacts
+    def _league(self, league):
+        """(model, team_stats, engine, ratings) for a league, reloaded if the files changed"""
+        # League names become artifact paths that get unpickled: only registered leagues
+        if league not in LEAGUE_CODES:
+            raise KeyError(f"Unknown league: {league}")
+        now = time.monotonic()
+        entry = self._leagues.get(league)
+        if entry is not None and now - entry['checked'] < self.reload_interval:
+            return entry['artifacts']
+
+        with self._lock:
+            versions = {name: version for name, version in artifact_versions(league, self.models_dir).items()
+                        if name in SERVICE_ARTIFACTS + OPTIONAL_ARTIFACTS}
+            missing = [name for name in SERVICE_ARTIFACTS if versions[name][1] is None]
+            if missing:
+                raise KeyError(f"No trained artifacts for {league} (missing: {', '.join(missing)})")
+
+            entry = self._leagues.get(league)
+            if entry is None or entry['versions'] != versions:
+                artifacts = (
+                    load_model(versions['model'][0]),
+                    load_team_stats(versions['team_stats'][0]),
+                    load_feature_state(versions['feature_state'][0]),
+                    load_ratings(versions['ratings'][0]) if versions['ratings'][1] is not None else None,
+                )
+                entry = {'versions': versions, 'artifacts': artifacts}
+            entry['checked'] = now
+            self._leagues[league] = entry
+            return entry['artifacts']
+
+    def features(self, league, home_team, away_team):
+        """Feature row (model feature order) for one fixture"""
+        model, team_stats, engine, ratings = self._league(league)
+        for team in (home_team, away_team):
+            if team not in team_stats:
+                raise KeyError(f"Unknown team for {league}: {team}")
+        features = engine.features_for(home_team, away_team)
+        if ratings is not None:
+            features.update(ratings.features_for(home_team, away_team))
+        missing = [col for col in model.feature_columns if col not in features]
+        if missing:
+            raise KeyError(f"Model for {league} needs features that were not built: {', '.join(missing)}")
+        return [features[col] for col in model.feature_columns]
+
+    # Function API
+    def predict_many(self, requests):
+        """
+        Score (league, home, away) requests with one predict call per league
+
+        Returns one result per request: {'away_win', 'draw', 'home_win'}
+        or {'error': message}.
+        """
+        results = [None] * len(requests)
+        by_league = {}
+        for i, (league, home_team, away_team) in enumerate(requests):
+            try:
+                row = self.features(league, home_team, away_team)
+            except KeyError as e:
+                results[i] = {'error': str(e.args[0])}
+                continue
+            by_league.setdefault(league, ([], []))
+            by_league[league][0].append(i)
+            by_league[league][1].append(row)
+
+        for league, (positions, rows) in by_league.items():
+            model = self._league(league)[0]
+            probs = model.predict_proba(np.asarray(rows, dtype=np.float32))
+            for i, p in zip(positions, probs):
+                results[i] = dict(zip(OUTCOMES, p.tolist()))
+        return results
+
+    def predict(self, league, home_team, away_team):
+        """Probabilities for one fixture (raises KeyError for unknown leagues/teams)"""
+        result = self.predict_many([(league, home_team, away_team)])[0]
+        if 'error' in result:
+            raise KeyError(result['error'])
+        return result
+
+    # Micro-batching
+    def submit(self, league, home_team, away_team):
+        """Queue a request for the batching worker; returns a Future"""
+        if self._worker is None:
+            self.start()
+        future = Future()
+        self._queue.put(((league, home_team, away_team), future))
+        return future
+
+    def start(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='predict-batcher', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.predict_many([request for request, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+def make_handler(service):
+    """HTTP handler bound to a PredictionService"""
+
+    class PredictHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                return self._send(200, {'status': 'ok'})
+            if url.path != '/predict':
+                return self._send(404, {'error': 'not found'})
+
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            missing = [k for k in ('league', 'home', 'away') if k not in params]
+            if missing:
+                return self._send(400, {'error': f"missing parameters: {', '.join(missing)}"})
+
+            result = service.submit(params['league'], params['home'], params['away']).result()
+            self._send(404 if 'error' in result else 200, result)
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/predict':
+                return self._send(404, {'error': 'not found'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                items = json.loads(self.rfile.read(length))
+                requests = [(item['league'], item['home'], item['away']) for item in items]
+                if not all(isinstance(value, str) for request in requests for value in request):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                return self._send(400, {'error': 'expected a JSON list of {league, home, away}'})
+            self._send(200, service.predict_many(requests))
+
+        def log_message(self, format, *args):
+            pass  # Keep request logging off the hot path
+
+    return PredictHandler
+
+
+def serve(service, host='127.0.0.1', port=8000):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    service.start()
+    print(f"🚀 Serving predictions on http://{host}:{port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve 1X2 predictions from trained models')
+    parser.add_argument('--models', type=str, default='models',
+                       help='Directory with trained artifacts')
+    parser.add_argument('--serve', action='store_true',
+                       help='Run the local HTTP API')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=64,
+                       help='Largest micro-batch')
+    parser.add_argument('--max-wait-ms', type=float, default=0.0,
+                       help='How long the batcher holds a batch open to fill it')
+    parser.add_argument('--league', type=str, help='League for a one-off prediction')
+    parser.add_argument('--home', type=str, help='Home team')
+    parser.add_argument('--away', type=str, help='Away team')
+
+    args = parser.parse_args()
+
+    service = PredictionService(args.models, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+
+    if args.serve:
+        serve(service, args.host, args.port)
+    elif args.league and args.home and args.away:
+        try:
+            result = service.predict(args.league, args.home, args.away)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            return
+        print(f"⚽ {args.home} vs {args.away}")
+        print(f"  Home Win: {result['home_win']:.1%}")
+        print(f"  Draw:     {result['draw']:.1%}")
+        print(f"  Away Win: {result['away_win']:.1%}")
+    else:
+        parser.error('use --serve, or --league with --home and --away')
+
+
+if __name__ == "__main__":
+    main()
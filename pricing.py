@@ -0,0 +1,373 @@
+"""
+Market pricing engines
+
+Two engines price the goals markets from home/away Poisson rates:
+- monte_carlo: sample 10,000 scorelines (original app path)
+- analytic: exact probabilities from the truncated home x away score
+  matrix built once from the two Poisson PMFs (no sampling noise)
+
+Both return the same dict shape; the analytic engine adds 1X2, any
+over/under line, correct scores and the score matrix itself. It also
+takes the Dixon-Coles low-score correlation `rho` (see team_strength.py);
+Monte Carlo samples independent Poissons and ignores it.
+
+price_fixtures prices goals, corners and cards for a whole fixture list
+in one vectorized call and returns a DataFrame (one row per fixture).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Over/under lines priced by the analytic engine
+GOAL_LINES = (0.5, 1.5, 2.5, 3.5, 4.5, 5.5)
+
+# Correct scores reported individually (0-0 .. 5-5)
+CORRECT_SCORE_MAX = 5
+
+
+# Prediction functions (Monte Carlo simulation)
+def monte_carlo_simulation(home_goals_avg, away_goals_avg, n_simulations=10000):
+    """Monte Carlo simulation for match outcome"""
+    home_goals = np.random.poisson(home_goals_avg, n_simulations)
+    away_goals = np.random.poisson(away_goals_avg, n_simulations)
+    total_goals = home_goals + away_goals
+
+    return {
+        'over_2_5': np.mean(total_goals > 2.5),
+        'under_2_5': 1 - np.mean(total_goals > 2.5),
+        'btts_yes': np.mean((home_goals > 0) & (away_goals > 0)),
+        'btts_no': 1 - np.mean((home_goals > 0) & (away_goals > 0)),
+        'avg_total_goals': np.mean(total_goals),
+        'goal_distribution': {
+            '0-1': np.mean(total_goals <= 1),
+            '2': np.mean(total_goals == 2),
+            '3': np.mean(total_goals == 3),
+            '4+': np.mean(total_goals >= 4)
+        }
+    }
+
+
+def predict_corners(home_corners_avg, away_corners_avg, n_simulations=10000):
+    """Monte Carlo simulation for corners"""
+    home_corners = np.random.poisson(home_corners_avg, n_simulations)
+    away_corners = np.random.poisson(away_corners_avg, n_simulations)
+    total_corners = home_corners + away_corners
+
+    return {
+        'over_8_5': np.mean(total_corners > 8.5),
+        'over_9_5': np.mean(total_corners > 9.5),
+        'over_10_5': np.mean(total_corners > 10.5),
+        'over_11_5': np.mean(total_corners > 11.5),
+        'avg_total_corners': np.mean(total_corners)
+    }
+
+
+def predict_cards(home_yellows_avg, away_yellows_avg, home_reds_avg=0.1, away_reds_avg=0.1, n_simulations=10000):
+    """Monte Carlo simulation for cards"""
+    home_yellows = np.random.poisson(home_yellows_avg, n_simulations)
+    away_yellows = np.random.poisson(away_yellows_avg, n_simulations)
+    home_reds = np.random.poisson(home_reds_avg, n_simulations)
+    away_reds = np.random.poisson(away_reds_avg, n_simulations)
+
+    total_cards = home_yellows + away_yellows + home_reds + away_reds
+    booking_points = (home_yellows + away_yellows) * 10 + (home_reds + away_reds) * 25
+
+    return {
+        'over_3_5': np.mean(total_cards > 3.5),
+        'over_4_5': np.mean(total_cards > 4.5),
+        'over_5_5': np.mean(total_cards > 5.5),
+        'avg_total_cards': np.mean(total_cards),
+        'avg_booking_points': np.mean(booking_points),
+        'over_40_booking_pts': np.mean(booking_points > 40),
+        'over_50_booking_pts': np.mean(booking_points > 50),
+        'over_60_booking_pts': np.mean(booking_points > 60)
+    }
+
+
+# Analytic (closed-form Poisson) engine
+def truncation_point(rate):
+    """Largest count kept; the Poisson tail beyond it is < 1e-12 for football-sized rates"""
+    rate = float(np.max(rate))
+    return int(np.ceil(rate + 12 * np.sqrt(rate) + 12))
+
+
+def poisson_pmf(rate, max_count):
+    """P(X = k) for k = 0..max_count, by the recurrence p[k] = p[k-1] * rate / k"""
+    ratios = np.empty(max_count + 1)
+    ratios[0] = np.exp(-rate)
+    ratios[1:] = rate / np.arange(1, max_count + 1)
+    return np.cumprod(ratios)
+
+
+def dixon_coles_adjustment(home_goals_avg, away_goals_avg, rho):
+    """
+    Dixon-Coles multipliers for the 0-0, 0-1, 1-0, 1-1 cells
+
+    Returns [[tau00, tau01], [tau10, tau11]] with a leading fixture axis
+    for array inputs. The adjustment moves probability between these
+    cells without changing the total.
+    """
+    lam, mu, rho = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64)
+                                         for x in (home_goals_avg, away_goals_avg, rho)))
+    tau = np.empty(lam.shape + (2, 2))
+    tau[..., 0, 0] = 1 - lam * mu * rho
+    tau[..., 0, 1] = 1 + lam * rho
+    tau[..., 1, 0] = 1 + mu * rho
+    tau[..., 1, 1] = 1 - rho
+    return tau
+
+
+def score_matrix(home_goals_avg, away_goals_avg, max_goals=None, rho=0.0):
+    """
+    Truncated joint scoreline distribution
+
+    matrix[i, j] = P(home scores i) * P(away scores j), i, j <= max_goals,
+    with the four low-score cells adjusted when rho != 0
+    """
+    if max_goals is None:
+        max_goals = truncation_point(max(home_goals_avg, away_goals_avg))
+    matrix = np.outer(poisson_pmf(home_goals_avg, max_goals), poisson_pmf(away_goals_avg, max_goals))
+    if rho:
+        matrix[:2, :2] *= dixon_coles_adjustment(home_goals_avg, away_goals_avg, rho)
+    return matrix
+
+
+def line_key(line):
+    """2.5 -> '2_5'"""
+    return f"{line:g}".replace('.', '_')
+
+
+def analytic_goal_markets(home_goals_avg, away_goals_avg, lines=GOAL_LINES, max_goals=None, rho=0.0):
+    """Exact goals markets derived from the score matrix"""
+    matrix = score_matrix(home_goals_avg, away_goals_avg, max_goals, rho)
+    n = matrix.shape[0]
+
+    # Total-goals PMF: sum along anti-diagonals
+    totals = np.add.outer(np.arange(n), np.arange(n))
+    total_pmf = np.bincount(totals.ravel(), matrix.ravel())[:n]
+    total_cdf = np.cumsum(total_pmf)
+
+    def p_over(line):
+        return 1 - total_cdf[int(np.floor(line))]
+
+    btts_yes = matrix[1:, 1:].sum()
+    home_win = np.tril(matrix, -1).sum()
+    draw = np.trace(matrix)
+    away_win = np.triu(matrix, 1).sum()
+
+    over_under = {}
+    for line in lines:
+        over = p_over(line)
+        over_under[line_key(line)] = {'over': over, 'under': 1 - over}
+
+    k = min(CORRECT_SCORE_MAX, n - 1)
+    correct_score = {
+        f"{i}-{j}": matrix[i, j] for i in range(k + 1) for j in range(k + 1)
+    }
+
+    over_2_5 = p_over(2.5)
+    return {
+        'over_2_5': over_2_5,
+        'under_2_5': 1 - over_2_5,
+        'btts_yes': btts_yes,
+        'btts_no': 1 - btts_yes,
+        'avg_total_goals': home_goals_avg + away_goals_avg,
+        'goal_distribution': {
+            '0-1': total_cdf[1],
+            '2': total_pmf[2],
+            '3': total_pmf[3],
+            '4+': 1 - total_cdf[3]
+        },
+        'match_result': {'home': home_win, 'draw': draw, 'away': away_win},
+        'over_under': over_under,
+        'correct_score': correct_score,
+        'score_matrix': matrix,
+    }
+
+
+PRICING_ENGINES = {
+    'analytic': analytic_goal_markets,
+    'monte_carlo': monte_carlo_simulation,
+}
+
+
+def price_goals(home_goals_avg, away_goals_avg, engine='analytic', rho=0.0):
+    """Price the goals markets with the selected engine (rho: analytic engine only)"""
+    if engine not in PRICING_ENGINES:
+        raise ValueError(f"Unknown pricing engine: {engine}")
+    if engine == 'analytic':
+        return analytic_goal_markets(home_goals_avg, away_goals_avg, rho=rho)
+    return PRICING_ENGINES[engine](home_goals_avg, away_goals_avg)
+
+
+# Batched multi-fixture pricing
+CORNER_LINES = (8.5, 9.5, 10.5, 11.5)
+CARD_LINES = (3.5, 4.5, 5.5)
+BOOKING_POINT_LINES = (40, 50, 60)
+
+RATE_COLUMNS = ['home_goals_avg', 'away_goals_avg', 'home_corners_avg', 'away_corners_avg',
+                'home_yellows_avg', 'away_yellows_avg', 'home_reds_avg', 'away_reds_avg']
+
+
+def poisson_pmf_batch(rates, max_count):
+    """Row-wise Poisson PMFs: (N,) rates -> (N, max_count + 1)"""
+    rates = np.asarray(rates, dtype=np.float64)
+    ratios = np.empty((len(rates), max_count + 1))
+    ratios[:, 0] = np.exp(-rates)
+    ratios[:, 1:] = rates[:, None] / np.arange(1, max_count + 1)
+    return np.cumprod(ratios, axis=1)
+
+
+def _over_probs(rates, lines):
+    """P(X > line) for X ~ Poisson(rate), every fixture x line"""
+    cdf = np.cumsum(poisson_pmf_batch(rates, int(max(lines))), axis=1)
+    return {line: 1 - cdf[:, int(np.floor(line))] for line in lines}
+
+
+def _sample_over_probs(rng, rates, lines, n_simulations):
+    totals = rng.poisson(np.asarray(rates, dtype=np.float64)[:, None], (len(rates), n_simulations))
+    return {line: (totals > line).mean(axis=1) for line in lines}, totals.mean(axis=1)
+
+
+def price_fixtures(home_goals, away_goals, home_corners=None, away_corners=None,
+                   home_yellows=None, away_yellows=None, home_reds=0.1, away_reds=0.1,
+                   index=None, engine='analytic', n_simulations=10000, seed=None, rho=0.0):
+    """
+    Price goals, corners and cards markets for N fixtures in one call
+
+    Args:
+        home_goals, away_goals: (N,) expected goals
+        home_corners, away_corners: (N,) expected corners (omit to skip corners)
+        home_yellows, away_yellows: (N,) expected yellow cards (omit to skip cards)
+        home_reds, away_reds: (N,) or scalar expected red cards
+        index: row labels for the result (e.g. fixture ids)
+        engine: 'analytic' (exact Poisson PMFs) or 'monte_carlo' (2-D sampling)
+        rho: (N,) or scalar Dixon-Coles correlation (analytic engine only)
+
+    Returns:
+        DataFrame with one row per fixture and one column per market
+    """
+    home_goals = np.asarray(home_goals, dtype=np.float64)
+    away_goals = np.asarray(away_goals, dtype=np.float64)
+    n = len(home_goals)
+    out = {}
+
+    if engine == 'analytic':
+        max_goals = truncation_point(np.max(np.r_[home_goals, away_goals, 0.0]))
+        home_pmf = poisson_pmf_batch(home_goals, max_goals)
+        away_pmf = poisson_pmf_batch(away_goals, max_goals)
+        joint = home_pmf[:, :, None] * away_pmf[:, None, :]
+
+        # Sum of independent Poissons is Poisson: totals need no convolution
+        total_pmf = poisson_pmf_batch(home_goals + away_goals, max(3, int(max(GOAL_LINES))))
+        btts_yes = (1 - home_pmf[:, 0]) * (1 - away_pmf[:, 0])
+
+        rho = np.broadcast_to(np.asarray(rho, dtype=np.float64), (n,))
+        if np.any(rho):
+            # Dixon-Coles moves rho * lam * mu * P(0-0) into 0-1 and 1-0, out of 0-0 and 1-1
+            joint[:, :2, :2] *= dixon_coles_adjustment(home_goals, away_goals, rho)
+            shift = rho * home_goals * away_goals * home_pmf[:, 0] * away_pmf[:, 0]
+            total_pmf[:, :3] += shift[:, None] * np.array([-1.0, 2.0, -1.0])
+            btts_yes = btts_yes - shift
+
+        total_cdf = np.cumsum(total_pmf, axis=1)
+        goal_over = {line: 1 - total_cdf[:, int(np.floor(line))] for line in GOAL_LINES}
+        home_win = np.tril(np.ones((max_goals + 1,) * 2), -1)
+        out['home_win'] = (joint * home_win).sum(axis=(1, 2))
+        out['draw'] = np.trace(joint, axis1=1, axis2=2)
+        out['away_win'] = (joint * home_win.T).sum(axis=(1, 2))
+        out['avg_total_goals'] = home_goals + away_goals
+        goals_dist = {'0-1': total_cdf[:, 1], '2': total_pmf[:, 2], '3': total_pmf[:, 3],
+                      '4+': 1 - total_cdf[:, 3]}
+    elif engine == 'monte_carlo':
+        rng = np.random.default_rng(seed)
+        home_sim = rng.poisson(home_goals[:, None], (n, n_simulations))
+        away_sim = rng.poisson(away_goals[:, None], (n, n_simulations))
+        totals = home_sim + away_sim
+        goal_over = {line: (totals > line).mean(axis=1) for line in GOAL_LINES}
+        btts_yes = ((home_sim > 0) & (away_sim > 0)).mean(axis=1)
+        out['home_win'] = (home_sim > away_sim).mean(axis=1)
+        out['draw'] = (home_sim == away_sim).mean(axis=1)
+        out['away_win'] = (home_sim < away_sim).mean(axis=1)
+        out['avg_total_goals'] = totals.mean(axis=1)
+        goals_dist = {'0-1': (totals <= 1).mean(axis=1), '2': (totals == 2).mean(axis=1),
+                      '3': (totals == 3).mean(axis=1), '4+': (totals >= 4).mean(axis=1)}
+    else:
+        raise ValueError(f"Unknown pricing engine: {engine}")
+
+    for line in GOAL_LINES:
+        out[f"over_{line_key(line)}"] = goal_over[line]
+        out[f"under_{line_key(line)}"] = 1 - goal_over[line]
+    out['btts_yes'] = btts_yes
+    out['btts_no'] = 1 - btts_yes
+    out['goals_0_1'] = goals_dist['0-1']
+    out['goals_2'] = goals_dist['2']
+    out['goals_3'] = goals_dist['3']
+    out['goals_4_plus'] = goals_dist['4+']
+
+    if home_corners is not None and away_corners is not None:
+        corner_rates = np.asarray(home_corners, dtype=np.float64) + np.asarray(away_corners, dtype=np.float64)
+        if engine == 'analytic':
+            corner_over = _over_probs(corner_rates, CORNER_LINES)
+            out['avg_total_corners'] = corner_rates
+        else:
+            corner_over, out['avg_total_corners'] = _sample_over_probs(rng, corner_rates, CORNER_LINES, n_simulations)
+        for line in CORNER_LINES:
+            out[f"corners_over_{line_key(line)}"] = corner_over[line]
+            out[f"corners_under_{line_key(line)}"] = 1 - corner_over[line]
+
+    if home_yellows is not None and away_yellows is not None:
+        yellow_rates = np.asarray(home_yellows, dtype=np.float64) + np.asarray(away_yellows, dtype=np.float64)
+        red_rates = np.broadcast_to(np.asarray(home_reds, dtype=np.float64) + np.asarray(away_reds, dtype=np.float64), (n,))
+
+        if engine == 'analytic':
+            card_over = _over_probs(yellow_rates + red_rates, CARD_LINES)
+            out['avg_total_cards'] = yellow_rates + red_rates
+            out['avg_booking_points'] = 10 * yellow_rates + 25 * red_rates
+
+            # Booking points = 10 * yellows + 25 * reds: condition on the red count
+            max_yellows = truncation_point(np.max(np.r_[yellow_rates, 0.0]))
+            max_reds = truncation_point(np.max(np.r_[red_rates, 0.0]))
+            yellow_cdf = np.cumsum(poisson_pmf_batch(yellow_rates, max_yellows), axis=1)
+            red_pmf = poisson_pmf_batch(red_rates, max_reds)
+            for points in BOOKING_POINT_LINES:
+                prob = np.zeros(n)
+                for reds in range(max_reds + 1):
+                    max_y = int(np.floor((points - 25 * reds) / 10))
+                    p_over = 1 - yellow_cdf[:, min(max_y, max_yellows)] if max_y >= 0 else 1.0
+                    prob += red_pmf[:, reds] * p_over
+                out[f"over_{points}_booking_pts"] = prob
+        else:
+            yellows = rng.poisson(yellow_rates[:, None], (n, n_simulations))
+            reds = rng.poisson(red_rates[:, None], (n, n_simulations))
+            total_cards = yellows + reds
+            booking_points = yellows * 10 + reds * 25
+            card_over = {line: (total_cards > line).mean(axis=1) for line in CARD_LINES}
+            out['avg_total_cards'] = total_cards.mean(axis=1)
+            out['avg_booking_points'] = booking_points.mean(axis=1)
+            for points in BOOKING_POINT_LINES:
+                out[f"over_{points}_booking_pts"] = (booking_points > points).mean(axis=1)
+
+        for line in CARD_LINES:
+            out[f"cards_over_{line_key(line)}"] = card_over[line]
+            out[f"cards_under_{line_key(line)}"] = 1 - card_over[line]
+
+    return pd.DataFrame(out, index=index)
+
+
+def price_fixture_frame(fixtures, engine='analytic', **kwargs):
+    """
+    price_fixtures for a DataFrame with RATE_COLUMNS
+
+    Rate columns that are missing skip their markets (reds default to 0.1).
+    """
+    def col(name, default=None):
+        return fixtures[name].to_numpy() if name in fixtures.columns else default
+
+    return price_fixtures(
+        col('home_goals_avg'), col('away_goals_avg'),
+        col('home_corners_avg'), col('away_corners_avg'),
+        col('home_yellows_avg'), col('away_yellows_avg'),
+        col('home_reds_avg', 0.1), col('away_reds_avg', 0.1),
+        index=fixtures.index, engine=engine, **kwargs
+    )
@@ -0,0 +1,314 @@
+"""
+Elo team ratings
+
+One chronological pass over every league's matches with an O(1) update
+per match. Teams are keyed by name across leagues, so promoted and
+relegated teams keep their rating. Updates are scaled by the goal
+difference (World Football Elo), and with `uncertainty` each team also
+carries a Glicko-style rating deviation: it grows while a team is idle,
+shrinks as it plays, and sets how far one result moves the rating.
+
+Every match gets its pre-match ratings as feature columns (matches on
+the same date never see each other, as in RollingFeatureEngine).
+
+RatingStore persists the engine and the pre-match rows, so a rerun only
+processes matches newer than the saved state:
+    models/ratings.pkl               engine state
+    models/rating_features.parquet   keys + rating columns per match
+
+Usage:
+    python ratings.py                  # update from the match store
+    python ratings.py --rebuild --uncertainty
+"""
+
+import argparse
+import math
+import os
+import pickle
+
+import pandas as pd
+
+from atomic import atomic_write
+from match_store import MatchStore
+
+ELO_INITIAL = 1500
+ELO_K = 20
+ELO_HOME_ADVANTAGE = 60
+
+# Rating deviation (uncertainty mode)
+RD_INITIAL = 200   # New teams, and the cap for idle ones
+RD_MIN = 50
+RD_RECOVERY_DAYS = 365  # Idle days for a settled team to return to RD_INITIAL
+
+ELO_COLUMNS = ['home_elo', 'away_elo', 'elo_home_expected']
+RD_COLUMNS = ['home_elo_rd', 'away_elo_rd']
+KEY_COLUMNS = ['league', 'date', 'home_team', 'away_team']
+
+_Q = math.log(10) / 400
+
+
+def goal_difference_multiplier(goal_diff):
+    """K multiplier: 1 for a one-goal game or draw, 1.5 for two, (11 + N) / 8 beyond"""
+    goal_diff = abs(goal_diff)
+    if goal_diff <= 1:
+        return 1.0
+    if goal_diff == 2:
+        return 1.5
+    return (11 + goal_diff) / 8
+
+
+def _g(rd):
+    """Glicko attenuation: less certain opponents count for less"""
+    return 1 / math.sqrt(1 + 3 * (_Q * rd) ** 2 / math.pi ** 2)
+
+
+class EloEngine:
+    """
+    Streaming Elo ratings
+
+    State:
+    - ratings: team -> rating
+    - deviations: team -> (rating deviation, date of last match), uncertainty mode only
+    """
+
+    def __init__(self, k=ELO_K, home_advantage=ELO_HOME_ADVANTAGE, initial=ELO_INITIAL, uncertainty=False):
+        self.k = k
+        self.home_advantage = home_advantage
+        self.initial = initial
+        self.uncertainty = uncertainty
+        self.ratings = {}
+        self.deviations = {}
+        self.current_date = None
+        self._pending = []
+
+    @property
+    def columns(self):
+        return ELO_COLUMNS + (RD_COLUMNS if self.uncertainty else [])
+
+    def rating(self, team):
+        return self.ratings.get(team, self.initial)
+
+    def deviation(self, team, date=None):
+        """Rating deviation, inflated for the days since the team last played"""
+        rd, last_date = self.deviations.get(team, (RD_INITIAL, None))
+        if date is None or last_date is None:
+            return rd
+        idle_days = max((date - last_date).days, 0)
+        growth = (RD_INITIAL ** 2 - RD_MIN ** 2) / RD_RECOVERY_DAYS
+        return min(math.sqrt(rd ** 2 + growth * idle_days), RD_INITIAL)
+
+    def _expected(self, diff, opponent_rd=None):
+        scale = _g(opponent_rd) if opponent_rd is not None else 1.0
+        return 1 / (1 + 10 ** (-scale * diff / 400))
+
+    def features_for(self, home_team, away_team):
+        """Pre-match ratings for a fixture given the committed results"""
+        home, away = self.rating(home_team), self.rating(away_team)
+        features = {'home_elo': home, 'away_elo': away}
+        if self.uncertainty:
+            date = self.current_date
+            home_rd, away_rd = self.deviation(home_team, date), self.deviation(away_team, date)
+            combined = math.sqrt(home_rd ** 2 + away_rd ** 2)
+            features['elo_home_expected'] = self._expected(home + self.home_advantage - away, combined)
+            features['home_elo_rd'] = home_rd
+            features['away_elo_rd'] = away_rd
+        else:
+            features['elo_home_expected'] = self._expected(home + self.home_advantage - away)
+        return features
+
+    def _commit(self):
+        """Apply the held-back results for the current date"""
+        for date, home_team, away_team, home_goals, away_goals in self._pending:
+            home, away = self.rating(home_team), self.rating(away_team)
+            diff = home + self.home_advantage - away
+            score = 1.0 if home_goals > away_goals else 0.0 if home_goals < away_goals else 0.5
+            multiplier = goal_difference_multiplier(home_goals - away_goals)
+
+            if not self.uncertainty:
+                delta = self.k * multiplier * (score - self._expected(diff))
+                self.ratings[home_team] = home + delta
+                self.ratings[away_team] = away - delta
+                continue
+
+            # Glicko-1 step for each side against the other's deviation
+            home_rd, away_rd = self.deviation(home_team, date), self.deviation(away_team, date)
+            sides = [(home_team, home, home_rd, away_rd, diff, score),
+                     (away_team, away, away_rd, home_rd, -diff, 1 - score)]
+            for team, rating, rd, opponent_rd, team_diff, team_score in sides:
+                g = _g(opponent_rd)
+                expected = self._expected(team_diff, opponent_rd)
+                d2 = 1 / (_Q ** 2 * g ** 2 * expected * (1 - expected))
+                precision = 1 / rd ** 2 + 1 / d2
+                self.ratings[team] = rating + multiplier * _Q / precision * g * (team_score - expected)
+                self.deviations[team] = (max(math.sqrt(1 / precision), RD_MIN), date)
+        self._pending = []
+
+    def advance_to(self, date):
+        """Commit pending results if `date` starts a new matchday"""
+        if self.current_date is not None and date < self.current_date:
+            raise ValueError(
+                f"Match dated {date} is older than rating state ({self.current_date})"
+            )
+        if self.current_date is None or date > self.current_date:
+            self._commit()
+            self.current_date = date
+
+    def flush(self):
+        """Commit every recorded result (ratings for fixtures after the last match)"""
+        self._commit()
+
+    def update(self, date, home_team, away_team, home_goals, away_goals):
+        """Record a played match (visible to fixtures on later dates only)"""
+        date = pd.Timestamp(date).date()
+        self.advance_to(date)
+        self._pending.append((date, home_team, away_team, home_goals, away_goals))
+
+    def transform(self, df):
+        """
+        Pre-match ratings for every match in one chronological pass
+
+        `df` must be sorted by date with no missing dates or scores.
+        Returns a DataFrame of `columns` indexed like `df`.
+        """
+        rows = []
+        # Plain Python values: iterating pandas columns costs more than the updates
+        for date, home_team, away_team, home_goals, away_goals in zip(
+            df['date'].to_numpy(dtype='datetime64[D]').tolist(),
+            df['home_team'].to_numpy(dtype=object), df['away_team'].to_numpy(dtype=object),
+            df['home_goals'].tolist(), df['away_goals'].tolist()
+        ):
+            self.advance_to(date)
+            rows.append(self.features_for(home_team, away_team))
+            self._pending.append((date, home_team, away_team, home_goals, away_goals))
+        return pd.DataFrame(rows, columns=self.columns, index=df.index)
+
+
+class RatingStore:
+    """
+    Persistent ratings for every league
+
+    update() resumes from the saved engine and only rates matches dated
+    after it; older additions (late results, corrections) trigger a full
+    rebuild. Settings changes also rebuild.
+    """
+
+    def __init__(self, store_dir='models', uncertainty=False):
+        self.uncertainty = uncertainty
+        self.state_file = os.path.join(store_dir, 'ratings.pkl')
+        self.features_file = os.path.join(store_dir, 'rating_features.parquet')
+
+    def _load_state(self):
+        if not (os.path.isfile(self.state_file) and os.path.isfile(self.features_file)):
+            return None
+        with open(self.state_file, 'rb') as f:
+            state = pickle.load(f)
+        if state['engine'].uncertainty != self.uncertainty:
+            return None
+        return state
+
+    def _prepare(self, matches):
+        """Every league's dated, scored matches in date order"""
+        df = matches.copy()
+        if 'league' not in df.columns:
+            df['league'] = ''
+        for col in ['league', 'home_team', 'away_team']:
+            df[col] = df[col].astype(str)
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df = df.dropna(subset=['date', 'home_goals', 'away_goals'])
+        df = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+        return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+    def _save(self, engine, table):
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        with atomic_write(self.features_file) as f:
+            table.to_parquet(f, index=False)
+        with atomic_write(self.state_file) as f:
+            pickle.dump({'engine': engine}, f)
+
+    def rebuild(self, matches):
+        """Rate every match from scratch; returns the rating table"""
+        df = self._prepare(matches)
+        engine = EloEngine(uncertainty=self.uncertainty)
+        table = pd.concat([df[KEY_COLUMNS], engine.transform(df)], axis=1)
+        self._save(engine, table)
+        return table
+
+    def update(self, matches):
+        """Rate matches not yet in the store; returns the full rating table"""
+        state = self._load_state()
+        if state is None:
+            return self.rebuild(matches)
+
+        df = self._prepare(matches)
+        table = pd.read_parquet(self.features_file)
+        table['date'] = table['date'].astype(df['date'].dtype)
+        seen = df[KEY_COLUMNS].merge(table[KEY_COLUMNS], how='left', indicator=True)['_merge'] == 'both'
+        new = df[~seen.to_numpy()]
+        if new.empty:
+            return table
+
+        engine = state['engine']
+        if engine.current_date is not None and new['date'].min().date() < engine.current_date:
+            print(f"⚠️ Matches older than {engine.current_date} arrived, rebuilding ratings...")
+            return self.rebuild(matches)
+
+        rows = pd.concat([new[KEY_COLUMNS], engine.transform(new)], axis=1)
+        table = pd.concat([table, rows], ignore_index=True)
+        self._save(engine, table)
+        return table
+
+
+def ratings_path(models_dir='models'):
+    return os.path.join(models_dir, 'ratings.pkl')
+
+
+def load_ratings(path):
+    """Saved engine with every result committed, for looking up current ratings"""
+    with open(path, 'rb') as f:
+        engine = pickle.load(f)['engine']
+    engine.flush()
+    return engine
+
+
+def join_ratings(keys, table):
+    """Rating columns for `keys` (league, date, home_team, away_team rows), aligned with them"""
+    keys = keys[KEY_COLUMNS].astype({'league': str, 'home_team': str, 'away_team': str})
+    keys = keys.assign(date=pd.to_datetime(keys['date']))
+    columns = [c for c in table.columns if c not in KEY_COLUMNS]
+    joined = keys.merge(table, on=KEY_COLUMNS, how='left')
+    return joined[columns].set_axis(keys.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update Elo ratings for every league')
+    parser.add_argument('--store', type=str, default='data/matches',
+                       help='Match store directory')
+    parser.add_argument('--output', type=str, default='models',
+                       help='Directory for the rating state')
+    parser.add_argument('--uncertainty', action='store_true',
+                       help='Track Glicko-style rating deviations')
+    parser.add_argument('--rebuild', action='store_true',
+                       help='Rate every match from scratch')
+    parser.add_argument('--top', type=int, default=10,
+                       help='Print the N highest-rated teams')
+
+    args = parser.parse_args()
+
+    store = MatchStore(args.store)
+    if not store.exists():
+        print(f"❌ No match store at {args.store}")
+        return
+
+    ratings = RatingStore(args.output, uncertainty=args.uncertainty)
+    matches = store.read()
+    table = ratings.rebuild(matches) if args.rebuild else ratings.update(matches)
+    print(f"💾 {len(table)} rated matches -> {ratings.state_file}")
+
+    engine = load_ratings(ratings.state_file)
+    top = sorted(engine.ratings.items(), key=lambda item: -item[1])[:args.top]
+    for team, rating in top:
+        print(f"  {rating:7.1f}  {team}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,42 +4,66 @@ Collects historical match data for Serie A, Serie B, and La Liga
 
 Usage:
     python scraper.py --league seria_a --seasons 3
+    python scraper.py --league seria_a serie_b laliga --seasons 3 --rate 0.5 --workers 4
+
+Testing against saved pages (no traffic to the real site):
+    python -m http.server 8000 --directory fixtures/soccerstats
+    python scraper.py --league seria_a --seasons 1 --base-url http://localhost:8000
 """
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import argparse
 from datetime import datetime
-import os
+
+from http_cache import ResponseCache
+from http_client import PoliteFetcher
+from leagues import LEAGUE_CODES
+from parsers import PARSERS, get_parser
+from match_store import MatchStore
+
+def current_season_year():
+    """End year of the season in progress (seasons run August-May)"""
+    now = datetime.now()
+    return now.year + 1 if now.month >= 8 else now.year
 
 class SoccerStatsScraper:
-    def __init__(self):
-        self.base_url = "https://www.soccerstats.com"
+    def __init__(self, base_url="https://www.soccerstats.com", rate=0.5, max_workers=4,
+                 cache_dir='data/http_cache', parser='lxml'):
+        self.base_url = base_url.rstrip('/')
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        self.delay = 2  # Seconds between requests (be respectful!)
+        self.parser = get_parser(parser)
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.fetcher = PoliteFetcher(self.headers, rate=rate, max_workers=max_workers, cache=self.cache)
         
     def get_league_url(self, league, season):
         """
         Get the URL for a specific league and season
         Note: You'll need to verify these URLs on SoccerStats.com
         """
-        league_codes = {
-            'seria_a': 'italy1',
-            'serie_b': 'italy2', 
-            'laliga': 'spain1'
-        }
-        
-        code = league_codes.get(league)
+        code = LEAGUE_CODES.get(league)
         if not code:
             raise ValueError(f"Unknown league: {league}")
+        
+        # Past seasons live under "<code>_<end year>" (verify on actual site)
+        if season < current_season_year():
+            code = f"{code}_{season}"
             
         # Example URL structure (verify on actual site)
         return f"{self.base_url}/results.asp?league={code}&pmtype=bydate"
     
+    def parse_matches(self, html, league, season_year):
+        """Extract match rows from a results page (see parsers.py for the selectors)"""
+        matches = self.parser.parse(html)
+        
+        season = f"{season_year-1}/{season_year}"
+        for match_data in matches:
+            match_data['season'] = season
+            match_data['league'] = league
+        
+        return matches
+    
     def scrape_matches(self, league, seasons=3):
         """
         Scrape match results for specified league and number of seasons
@@ -47,73 +71,45 @@ class SoccerStatsScraper:
         Returns:
             DataFrame with columns: date, home_team, away_team, home_goals, away_goals, season
         """
-        all_matches = []
-        current_year = datetime.now().year
+        return self.scrape_many([league], seasons)
+    
+    def scrape_many(self, leagues, seasons=3):
+        """
+        Scrape several leagues and seasons concurrently
         
-        print(f"🔍 Scraping {league.upper()} data...")
+        Pages are fetched in parallel through one pooled session; the
+        per-host token bucket keeps the overall request rate polite.
+        Completed seasons are cached as immutable and never fetched twice.
+        
+        Returns:
+            DataFrame with columns: date, home_team, away_team, home_goals, away_goals, season, league
+        """
+        current_year = current_season_year()
+        
+        print(f"🔍 Scraping {', '.join(l.upper() for l in leagues)} data...")
         print(f"📅 Seasons: {seasons} (this is a template - adapt to actual SoccerStats structure)")
         
-        for season_offset in range(seasons):
-            season_year = current_year - season_offset
-            print(f"\n⚽ Processing {season_year-1}/{season_year} season...")
-            
-            try:
-                # Get league page
-                url = self.get_league_url(league, season_year)
-                print(f"🌐 Fetching: {url}")
-                
-                response = requests.get(url, headers=self.headers)
-                response.raise_for_status()
-                
-                # Parse HTML
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # TODO: Adapt these selectors to actual SoccerStats HTML structure
-                # This is a TEMPLATE - you need to inspect the actual site
-                
-                # Example: Find match result tables
-                match_tables = soup.find_all('table', class_='matches')  # Adjust selector
-                
-                matches_this_season = 0
-                
-                for table in match_tables:
-                    rows = table.find_all('tr')[1:]  # Skip header
-                    
-                    for row in rows:
-                        cells = row.find_all('td')
-                        
-                        if len(cells) >= 5:  # Adjust based on actual structure
-                            try:
-                                match_data = {
-                                    'date': cells[0].text.strip(),
-                                    'home_team': cells[1].text.strip(),
-                                    'score': cells[2].text.strip(),  # e.g., "2-1"
-                                    'away_team': cells[3].text.strip(),
-                                    'season': f"{season_year-1}/{season_year}",
-                                    'league': league
-                                }
-                                
-                                # Parse score
-                                if '-' in match_data['score']:
-                                    home_goals, away_goals = match_data['score'].split('-')
-                                    match_data['home_goals'] = int(home_goals.strip())
-                                    match_data['away_goals'] = int(away_goals.strip())
-                                    
-                                    all_matches.append(match_data)
-                                    matches_this_season += 1
-                                    
-                            except Exception as e:
-                                print(f"⚠️ Error parsing row: {e}")
-                                continue
-                
-                print(f"✅ Found {matches_this_season} matches")
-                
-                # Be respectful - delay between requests
-                time.sleep(self.delay)
-                
-            except Exception as e:
-                print(f"❌ Error scraping season {season_year}: {e}")
+        jobs = []
+        for league in leagues:
+            for season_offset in range(seasons):
+                season_year = current_year - season_offset
+                jobs.append((league, season_year, self.get_league_url(league, season_year)))
+        
+        print(f"🌐 Fetching {len(jobs)} pages ({self.fetcher.max_workers} workers, "
+              f"{self.fetcher.rate:g} req/s per host)...")
+        completed = [url for _, season_year, url in jobs if season_year < current_year]
+        responses = self.fetcher.fetch_all((url for _, _, url in jobs), immutable=completed)
+        
+        all_matches = []
+        for league, season_year, url in jobs:
+            response = responses[url]
+            if isinstance(response, Exception):
+                print(f"❌ Error scraping {league} {season_year-1}/{season_year}: {response}")
                 continue
+            
+            matches = self.parse_matches(response.content, league, season_year)
+            print(f"✅ {league} {season_year-1}/{season_year}: found {len(matches)} matches")
+            all_matches.extend(matches)
         
         # Convert to DataFrame
         df = pd.DataFrame(all_matches)
@@ -125,17 +121,20 @@ class SoccerStatsScraper:
             df = df.sort_values('date')
             
         print(f"\n✨ Total matches collected: {len(df)}")
+        if self.cache is not None:
+            print(self.cache.summary())
         return df
     
-    def save_data(self, df, league, output_dir='data/raw'):
-        """Save scraped data to CSV"""
-        os.makedirs(output_dir, exist_ok=True)
+    def save_data(self, df, league=None, output_dir='data/matches'):
+        """Save scraped data to the Parquet match store (one partition per league/season)"""
+        df = df.copy()
+        if league is not None:
+            df['league'] = league
         
-        filename = f"{output_dir}/{league}_{datetime.now().strftime('%Y%m%d')}.csv"
-        df.to_csv(filename, index=False)
+        count = MatchStore(output_dir).write(df)
         
-        print(f"💾 Data saved to: {filename}")
-        return filename
+        print(f"💾 {count} matches saved to: {output_dir}")
+        return output_dir
 
 def create_sample_data(league, num_matches=100):
     """
@@ -150,11 +149,26 @@ def create_sample_data(league, num_matches=100):
         'serie_b': ["Parma", "Como", "Venezia", "Cremonese", "Catanzaro",
                     "Palermo", "Brescia", "Sampdoria", "Pisa", "Spezia"],
         'laliga': ["Real Madrid", "Barcelona", "Atlético Madrid", "Real Sociedad",
-                   "Athletic Bilbao", "Real Betis", "Villarreal", "Valencia"]
+                   "Athletic Bilbao", "Real Betis", "Villarreal", "Valencia"],
+        'laliga_2': ["Levante", "Mirandés", "Racing Santander", "Almería", "Huesca",
+                     "Elche", "Oviedo", "Málaga", "Sporting Gijón", "Zaragoza"],
+        'premier_league': ["Liverpool", "Arsenal", "Chelsea", "Manchester City", "Newcastle",
+                           "Aston Villa", "Tottenham", "Manchester United", "Brighton", "West Ham"],
+        'bundesliga': ["Bayern Munich", "Bayer Leverkusen", "Borussia Dortmund", "RB Leipzig",
+                       "Eintracht Frankfurt", "VfB Stuttgart", "Freiburg", "Werder Bremen"],
+        'bundesliga_2': ["Hamburger SV", "1. FC Köln", "Hannover 96", "Fortuna Düsseldorf",
+                         "Kaiserslautern", "Hertha BSC", "Schalke 04", "Nürnberg"],
+        'j1_league': ["Vissel Kobe", "Sanfrecce Hiroshima", "Kawasaki Frontale", "Urawa Red Diamonds",
+                      "Kashima Antlers", "Yokohama F. Marinos", "Gamba Osaka", "FC Tokyo"],
+        'swiss_super_league': ["Young Boys", "Basel", "FC Zurich", "Lugano", "Servette",
+                               "St. Gallen", "Lucerne", "Grasshoppers"],
     }
     
     import numpy as np
     
+    if league not in teams:
+        raise ValueError(f"No demo teams for league: {league}")
+    
     matches = []
     for i in range(num_matches):
         home_team = np.random.choice(teams[league])
@@ -182,35 +196,50 @@ def create_sample_data(league, num_matches=100):
 
 def main():
     parser = argparse.ArgumentParser(description='Scrape football match data from SoccerStats')
-    parser.add_argument('--league', type=str, required=True, 
-                       choices=['seria_a', 'serie_b', 'laliga'],
-                       help='League to scrape')
+    parser.add_argument('--league', type=str, required=True, nargs='+',
+                       choices=list(LEAGUE_CODES),
+                       help='League(s) to scrape')
     parser.add_argument('--seasons', type=int, default=3,
                        help='Number of seasons to scrape')
     parser.add_argument('--demo', action='store_true',
                        help='Generate demo data instead of scraping')
+    parser.add_argument('--base-url', type=str, default='https://www.soccerstats.com',
+                       help='Site to scrape (point at a local stub to test against fixture pages)')
+    parser.add_argument('--rate', type=float, default=0.5,
+                       help='Maximum requests per second per host')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Concurrent requests in flight')
+    parser.add_argument('--cache-dir', type=str, default='data/http_cache',
+                       help='HTTP response cache directory')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always download pages, ignoring the response cache')
+    parser.add_argument('--parser', type=str, default='lxml', choices=list(PARSERS),
+                       help='HTML parser backend for results pages')
     
     args = parser.parse_args()
     
+    scraper = SoccerStatsScraper(base_url=args.base_url, rate=args.rate, max_workers=args.workers,
+                                 cache_dir=None if args.no_cache else args.cache_dir,
+                                 parser=args.parser)
+    
     if args.demo:
         # Create sample data for testing
-        df = create_sample_data(args.league, num_matches=200)
+        df = pd.concat([create_sample_data(league, num_matches=200) for league in args.league],
+                       ignore_index=True)
     else:
         # Real scraping
         print("⚠️ IMPORTANT: Before running this scraper:")
         print("1. Check SoccerStats.com Terms of Service")
         print("2. Inspect the actual HTML structure of the site")
-        print("3. Update the CSS selectors in scrape_matches()")
+        print("3. Update the selectors in parsers.py")
         print("4. Test with small requests first")
         print("\nThis is a TEMPLATE that needs customization!\n")
         
-        scraper = SoccerStatsScraper()
-        df = scraper.scrape_matches(args.league, args.seasons)
+        df = scraper.scrape_many(args.league, args.seasons)
     
     if not df.empty:
         # Save data
-        scraper = SoccerStatsScraper()
-        scraper.save_data(df, args.league)
+        scraper.save_data(df)
         
         # Show preview
         print("\n📊 Data Preview:")
@@ -0,0 +1,190 @@
+"""
+Bet settlement
+
+Joins every pending ledger bet to its match result on (date, home_team,
+away_team), evaluates the bet types with vectorized rules and writes
+Result / Profit_Loss back in one transaction.
+
+Supported Bet_Type labels (case-insensitive, as logged by the app):
+    'Over 2.5' / 'Under 2.5'              total goals
+    'Over 10.5 corners' / 'Under ...'     total corners
+    'Over 4.5 cards' / 'Under ...'        total cards (yellows + reds)
+    'BTTS Yes' / 'BTTS No'
+    'Home Win' / 'Draw' / 'Away Win'
+
+Bets stay pending when their match is not in the store yet, the label is
+not recognised, or the match data lacks the stat they need (the match
+store has no corner/card columns yet). An Over/Under bet landing exactly
+on a whole-number line is void (stake returned).
+
+Usage:
+    python settlement.py
+    python settlement.py --db data/ledger.db --store data/matches --dry-run
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ledger import BetLedger
+from match_store import MatchStore
+
+LINE_RE = r'^(?P<side>over|under) (?P<line>\d+(?:\.\d+)?)(?: (?P<family>goals|corners|cards))?$'
+BTTS_RE = r'^btts (?P<side>yes|no)$'
+RESULT_SIDES = {'home win': 'home', 'draw': 'draw', 'away win': 'away'}
+
+# Family -> match columns summed for the total
+TOTAL_COLUMNS = {
+    'goals': ['home_goals', 'away_goals'],
+    'corners': ['home_corners', 'away_corners'],
+    'cards': ['home_yellows', 'away_yellows', 'home_reds', 'away_reds'],
+}
+
+MATCH_KEYS = ['date', 'home_team', 'away_team']
+
+
+def parse_bet_types(bet_types):
+    """
+    Bet_Type labels -> DataFrame with family, side, line
+
+    family is NaN for labels that cannot be settled automatically.
+    """
+    labels = pd.Series(bet_types, dtype=str).str.strip().str.lower().str.replace(r'\s+', ' ', regex=True)
+
+    parsed = labels.str.extract(LINE_RE)
+    parsed['line'] = parsed['line'].astype(float)
+    parsed['family'] = parsed['family'].where(parsed['side'].isna(), parsed['family'].fillna('goals'))
+
+    btts = labels.str.extract(BTTS_RE)['side']
+    is_btts = btts.notna()
+    parsed.loc[is_btts, 'family'] = 'btts'
+    parsed.loc[is_btts, 'side'] = btts[is_btts]
+
+    result_side = labels.map(RESULT_SIDES)
+    is_result = result_side.notna()
+    parsed.loc[is_result, 'family'] = '1x2'
+    parsed.loc[is_result, 'side'] = result_side[is_result]
+    return parsed[['family', 'side', 'line']]
+
+
+def _match_totals(joined):
+    """Per-family totals for every joined bet (NaN where the stats are missing)"""
+    totals = {}
+    for family, columns in TOTAL_COLUMNS.items():
+        if all(col in joined.columns for col in columns):
+            totals[family] = joined[columns].to_numpy(dtype=np.float64).sum(axis=1)
+        else:
+            totals[family] = np.full(len(joined), np.nan)
+    return totals
+
+
+def settle_bets(bets, matches):
+    """
+    Evaluate pending bets against match results
+
+    Args:
+        bets: DataFrame with id, date, home_team, away_team, bet_type, odds, stake
+        matches: results with date, home_team, away_team, home_goals, away_goals
+            (plus optional corner/card columns, see TOTAL_COLUMNS)
+
+    Returns:
+        DataFrame with id, result ('Won'/'Lost'/'Void'), profit_loss for
+        the bets that could be settled
+    """
+    matches = matches.copy()
+    matches['date'] = pd.to_datetime(matches['date']).dt.strftime('%Y-%m-%d')
+    matches['home_team'] = matches['home_team'].astype(str)
+    matches['away_team'] = matches['away_team'].astype(str)
+    matches = matches.drop_duplicates(subset=MATCH_KEYS, keep='last')
+
+    bets = bets.reset_index(drop=True).copy()
+    bets['date'] = pd.to_datetime(bets['date'], errors='coerce').dt.strftime('%Y-%m-%d')
+    bets = pd.concat([bets, parse_bet_types(bets['bet_type'])], axis=1)
+
+    joined = bets.merge(matches, on=MATCH_KEYS, how='inner')
+    if joined.empty:
+        return pd.DataFrame({'id': [], 'result': [], 'profit_loss': []})
+
+    family = joined['family'].to_numpy(dtype=object)
+    side = joined['side'].to_numpy(dtype=object)
+    line = joined['line'].to_numpy(dtype=np.float64)
+    home_goals = joined['home_goals'].to_numpy(dtype=np.float64)
+    away_goals = joined['away_goals'].to_numpy(dtype=np.float64)
+
+    totals = _match_totals(joined)
+    is_line = np.isin(family, list(TOTAL_COLUMNS))
+    total = np.select(
+        [family == name for name in TOTAL_COLUMNS],
+        [totals[name] for name in TOTAL_COLUMNS],
+        default=np.nan,
+    )
+
+    over = total > line
+    under = total < line
+    btts = (home_goals > 0) & (away_goals > 0)
+    winner = np.select([home_goals > away_goals, home_goals < away_goals], ['home', 'away'], default='draw')
+
+    won = np.select(
+        [is_line & (side == 'over'), is_line & (side == 'under'),
+         (family == 'btts') & (side == 'yes'), (family == 'btts') & (side == 'no'),
+         family == '1x2'],
+        [over, under, btts, ~btts, winner == side],
+        default=False,
+    )
+    void = is_line & (total == line)
+    settleable = (is_line & ~np.isnan(total)) | (family == 'btts') | (family == '1x2')
+
+    stake = joined['stake'].to_numpy(dtype=np.float64)
+    odds = joined['odds'].to_numpy(dtype=np.float64)
+    result = np.where(void, 'Void', np.where(won, 'Won', 'Lost'))
+    profit_loss = np.where(void, 0.0, np.where(won, stake * (odds - 1), -stake))
+
+    return pd.DataFrame({
+        'id': joined['id'].to_numpy()[settleable],
+        'result': result[settleable],
+        'profit_loss': profit_loss[settleable],
+    })
+
+
+def settle_pending(ledger, matches, dry_run=False):
+    """Settle every pending bet in the ledger; returns (pending, settled)"""
+    pending = ledger.pending()
+    settled = settle_bets(pending, matches)
+    if not dry_run and len(settled):
+        ledger.settle(settled)
+    return pending, settled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Settle pending bets against match results')
+    parser.add_argument('--db', type=str, default='data/ledger.db',
+                       help='Ledger database file')
+    parser.add_argument('--store', type=str, default='data/matches',
+                       help='Match store directory')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Show what would be settled without writing')
+
+    args = parser.parse_args()
+
+    store = MatchStore(args.store)
+    if not store.exists():
+        print(f"❌ No match store at {args.store}")
+        return
+
+    ledger = BetLedger(args.db)
+    matches = store.read()
+    pending, settled = settle_pending(ledger, matches, dry_run=args.dry_run)
+
+    counts = settled['result'].value_counts()
+    print(f"🧾 {len(pending)} pending bets, {len(settled)} settled "
+          f"({counts.get('Won', 0)} won, {counts.get('Lost', 0)} lost, {counts.get('Void', 0)} void), "
+          f"P/L {settled['profit_loss'].sum():+.2f} units")
+    if len(pending) > len(settled):
+        print(f"⏳ {len(pending) - len(settled)} bets left pending (no result or unsupported bet type)")
+    if args.dry_run:
+        print("ℹ️ Dry run - ledger not updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Per-league team-stats snapshot backing the app's get_team_stats / get_form_details
+
+Built offline from the match store and saved next to each league's model:
+
+    models/{league}_team_stats.npz      one array per column, one row per team
+    models/{league}_feature_state.pkl   rolling feature engine fed with every match
+    models/{league}_team_strength.npz   Dixon-Coles ratings (team_strength.py)
+
+Lookups go through a team -> row dict, so reading a team is O(1) and
+never touches the match history. A refresh only recomputes the teams
+that played after the snapshot's `as_of` date; matches added later for
+dates already covered need a full rebuild. Team strengths are refitted
+on every build or refresh, starting from the saved fit.
+
+Usage:
+    python team_stats.py                      # rebuild every league in the store
+    python team_stats.py --league seria_a --refresh
+"""
+
+import argparse
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from atomic import atomic_write
+from features import RollingFeatureEngine, team_perspective
+from match_store import MatchStore
+from team_strength import save_team_strength
+
+STATS_WINDOW = 10  # Matches averaged for goals/corners/cards
+FORM_WINDOW = 5    # Matches shown as recent form
+
+# Optional per-side match columns -> team stat
+OPTIONAL_STATS = {
+    'corners_avg': ('home_corners', 'away_corners'),
+    'yellows_avg': ('home_yellows', 'away_yellows'),
+    'reds_avg': ('home_reds', 'away_reds'),
+}
+
+FLOAT_COLUMNS = ['goals_avg', 'conceded_avg', 'corners_avg', 'yellows_avg', 'reds_avg']
+SNAPSHOT_COLUMNS = FLOAT_COLUMNS + ['form', 'results', 'last_match_date', 'matches']
+
+
+def team_stats_path(league, models_dir='models'):
+    return os.path.join(models_dir, f"{league}_team_stats.npz")
+
+
+def feature_state_path(league, models_dir='models'):
+    return os.path.join(models_dir, f"{league}_feature_state.pkl")
+
+
+def _long_table(matches):
+    """team_perspective plus the optional corner/card columns"""
+    long_df = team_perspective(matches)
+    long_df['date'] = pd.to_datetime(long_df['date'])
+    for stat, (home_col, away_col) in OPTIONAL_STATS.items():
+        if home_col in matches.columns and away_col in matches.columns:
+            long_df[stat] = np.concatenate([matches[home_col].to_numpy(), matches[away_col].to_numpy()])
+        else:
+            long_df[stat] = np.nan
+    long_df['team'] = long_df['team'].astype(str)
+    return long_df.sort_values(['team', 'match'], kind='stable')
+
+
+def _team_rows(long_df):
+    """
+    Snapshot columns for every team in a long table
+
+    Columns: goals_avg, conceded_avg, corners/yellows/reds averages (NaN
+    when the match data has no such columns) over the last 10 matches;
+    form = points from the last 5 (out of 15); results = last 5 as a
+    'W'/'D'/'L' string, oldest first; last_match_date; matches played.
+    """
+    recent = long_df.groupby('team', sort=True).tail(STATS_WINDOW).groupby('team', sort=True)
+    form = long_df.groupby('team', sort=True).tail(FORM_WINDOW)
+    letters = np.where(form['win'] == 1, 'W', np.where(form['draw'] == 1, 'D', 'L'))
+    form = form.assign(letter=letters).groupby('team', sort=True)
+
+    columns = {
+        'goals_avg': recent['goals_for'].mean(),
+        'conceded_avg': recent['goals_against'].mean(),
+        'corners_avg': recent['corners_avg'].mean(),
+        'yellows_avg': recent['yellows_avg'].mean(),
+        'reds_avg': recent['reds_avg'].mean(),
+        'form': form['points'].sum(),
+        'results': form['letter'].agg(''.join),
+        'last_match_date': long_df.groupby('team', sort=True)['date'].max(),
+        'matches': long_df.groupby('team', sort=True).size(),
+    }
+    teams = columns['goals_avg'].index.to_numpy(dtype=str)
+    arrays = {name: col.reindex(teams).to_numpy() for name, col in columns.items()}
+    for name in FLOAT_COLUMNS:
+        arrays[name] = arrays[name].astype(np.float64)
+    arrays['form'] = arrays['form'].astype(np.int64)
+    arrays['matches'] = arrays['matches'].astype(np.int64)
+    arrays['results'] = arrays['results'].astype(f'U{FORM_WINDOW}')
+    arrays['last_match_date'] = arrays['last_match_date'].astype('datetime64[D]')
+    return teams, arrays
+
+
+class TeamStatsSnapshot:
+    """
+    Column arrays indexed by team name
+
+    State:
+    - teams: team names, one per row
+    - columns: name -> NumPy array aligned with `teams` (SNAPSHOT_COLUMNS)
+    - as_of: date of the latest match included
+    """
+
+    def __init__(self, teams, columns, as_of):
+        self.teams = teams
+        self.columns = columns
+        self.as_of = as_of
+        self._index = {team: i for i, team in enumerate(teams)}
+
+    def __contains__(self, team):
+        return team in self._index
+
+    def __len__(self):
+        return len(self.teams)
+
+    def lookup(self, team):
+        """Stats for one team as a dict (None if the team is unknown)"""
+        i = self._index.get(team)
+        if i is None:
+            return None
+        row = {name: col[i].item() for name, col in self.columns.items()}
+        row['last_match_date'] = pd.Timestamp(self.columns['last_match_date'][i])
+        return row
+
+    def to_frame(self):
+        return pd.DataFrame(self.columns, index=pd.Index(self.teams, name='team'))
+
+    @classmethod
+    def build(cls, matches):
+        """Snapshot from a league's full match history"""
+        matches = matches.sort_values('date', kind='stable').reset_index(drop=True)
+        teams, columns = _team_rows(_long_table(matches))
+        return cls(teams, columns, np.datetime64(matches['date'].max(), 'D'))
+
+    def refresh(self, matches):
+        """
+        Recompute only the teams that played after `as_of`
+
+        `matches` is the league's full history (each team's window needs its
+        older matches too). Returns the names of the updated teams.
+        """
+        matches = matches.sort_values('date', kind='stable').reset_index(drop=True)
+        dates = matches['date'].to_numpy(dtype='datetime64[D]')
+        new = dates > self.as_of
+        if not new.any():
+            return []
+
+        played = set(matches.loc[new, 'home_team'].astype(str)) | set(matches.loc[new, 'away_team'].astype(str))
+        long_df = _long_table(matches)
+        teams, columns = _team_rows(long_df[long_df['team'].isin(played)])
+
+        rows = np.array([self._index.get(team, -1) for team in teams])
+        known = rows >= 0
+        for name, col in columns.items():
+            self.columns[name][rows[known]] = col[known]
+            self.columns[name] = np.concatenate([self.columns[name], col[~known]])
+        self.teams = np.concatenate([self.teams, teams[~known]])
+        self._index = {team: i for i, team in enumerate(self.teams)}
+        self.as_of = dates.max()
+        return list(teams)
+
+    def save(self, path):
+        with atomic_write(path) as f:
+            np.savez(f, teams=self.teams, as_of=self.as_of, **self.columns)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in SNAPSHOT_COLUMNS}
+            return cls(data['teams'], columns, data['as_of'][()])
+
+
+def build_feature_state(matches, **feature_config):
+    """Rolling engine (RollingFeatureEngine keyword arguments) fed with every match, ready for upcoming fixtures"""
+    engine = RollingFeatureEngine(**feature_config)
+    engine.transform(matches.dropna(subset=['date']))
+    engine.flush()
+    return engine
+
+
+def refresh_feature_state(engine, matches, as_of):
+    """Feed the engine the matches played after `as_of`"""
+    matches = matches.sort_values('date', kind='stable')
+    new = matches[matches['date'].to_numpy(dtype='datetime64[D]') > as_of]
+    for date, home_team, away_team, home_goals, away_goals in zip(
+        new['date'], new['home_team'], new['away_team'], new['home_goals'], new['away_goals']
+    ):
+        engine.update(date, home_team, away_team, home_goals, away_goals)
+    engine.flush()
+    return engine
+
+
+def save_team_stats(matches, league, models_dir='models', feature_config=None):
+    """
+    Build and save the team-stats snapshot, feature state and team strengths for a league
+
+    `feature_config` sets the engine's windows (RollingFeatureEngine
+    keyword arguments); by default a rebuild keeps the saved engine's.
+    """
+    state_file = feature_state_path(league, models_dir)
+    if feature_config is None:
+        feature_config = {}
+        if os.path.exists(state_file):
+            with open(state_file, 'rb') as f:
+                feature_config = pickle.load(f).config
+
+    path = TeamStatsSnapshot.build(matches).save(team_stats_path(league, models_dir))
+    with atomic_write(state_file) as f:
+        pickle.dump(build_feature_state(matches, **feature_config), f)
+    save_team_strength(matches, league, models_dir)
+    return path
+
+
+def refresh_team_stats(matches, league, models_dir='models'):
+    """Update an existing snapshot in place (full build if there is none)"""
+    path = team_stats_path(league, models_dir)
+    state_file = feature_state_path(league, models_dir)
+    if not (os.path.exists(path) and os.path.exists(state_file)):
+        save_team_stats(matches, league, models_dir)
+        return None
+
+    snapshot = TeamStatsSnapshot.load(path)
+    with open(state_file, 'rb') as f:
+        engine = pickle.load(f)
+
+    as_of = snapshot.as_of
+    updated = snapshot.refresh(matches)
+    if updated:
+        refresh_feature_state(engine, matches, as_of)
+        snapshot.save(path)
+        with atomic_write(state_file) as f:
+            pickle.dump(engine, f)
+        save_team_strength(matches, league, models_dir)
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build per-league team-stats snapshots')
+    parser.add_argument('--league', type=str, nargs='+', default=None,
+                       help='Leagues to build (default: every league in the store)')
+    parser.add_argument('--store', type=str, default='data/matches',
+                       help='Match store directory')
+    parser.add_argument('--output', type=str, default='models',
+                       help='Directory for the snapshots')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Only update teams that played since the last snapshot')
+
+    args = parser.parse_args()
+
+    store = MatchStore(args.store)
+    if not store.exists():
+        print(f"❌ No match store at {args.store}")
+        return
+
+    for league in args.league or store.leagues():
+        matches = store.read(league=league)
+        if matches.empty:
+            print(f"⚠️ {league}: no matches in store")
+            continue
+
+        if args.refresh:
+            updated = refresh_team_stats(matches, league, args.output)
+            if updated is None:
+                print(f"📦 {league}: no snapshot yet, built {team_stats_path(league, args.output)}")
+            else:
+                print(f"🔄 {league}: {len(updated)} teams updated")
+        else:
+            path = save_team_stats(matches, league, args.output)
+            print(f"💾 {league}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote
+
+import pytest
+
+import predict_service
+from predict_service import PredictionService, make_handler
+
+TRAVERSAL_LEAGUE = '../models/seria_a'
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # Nothing may be unpickled for a league outside the registry
+    def refuse(*args):
+        raise AssertionError('artifact loaded for an unregistered league')
+
+    for name in ('load_model', 'load_team_stats', 'load_feature_state', 'load_ratings'):
+        monkeypatch.setattr(predict_service, name, refuse)
+    return PredictionService(str(tmp_path / 'models'))
+
+
+def test_traversal_league_is_refused(service):
+    result = service.predict_many([(TRAVERSAL_LEAGUE, 'Napoli', 'Inter')])[0]
+    assert result == {'error': f"Unknown league: {TRAVERSAL_LEAGUE}"}
+    with pytest.raises(KeyError):
+        service.predict(TRAVERSAL_LEAGUE, 'Napoli', 'Inter')
+
+
+def test_traversal_league_is_refused_over_http(service):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(service))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}?league={quote(TRAVERSAL_LEAGUE)}&home=Napoli&away=Inter")
+        assert error.value.code == 404
+        assert 'Unknown league' in json.loads(error.value.read())['error']
+
+        body = json.dumps([{'league': TRAVERSAL_LEAGUE, 'home': 'Napoli', 'away': 'Inter'}]).encode()
+        with urllib.request.urlopen(urllib.request.Request(url, data=body)) as response:
+            assert 'Unknown league' in json.loads(response.read())[0]['error']
+
+        body = json.dumps([{'league': ['seria_a'], 'home': 'Napoli', 'away': 'Inter'}]).encode()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(url, data=body))
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,70 @@
+import os
+import runpy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import pre_match_prices, pre_match_rates
+from team_strength import save_team_strength
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app (5).py')
+APP_LEAGUE = "🇮🇹 Serie A"
+MARKETS = {
+    'home_win': ('match_result', 'home'),
+    'draw': ('match_result', 'draw'),
+    'away_win': ('match_result', 'away'),
+    'over_2_5': ('over_2_5',),
+    'under_2_5': ('under_2_5',),
+    'btts_yes': ('btts_yes',),
+    'btts_no': ('btts_no',),
+}
+
+
+def league_history(seed=7, teams=8, seasons=2):
+    """Double round-robins with team strengths, one matchday a week"""
+    rng = np.random.default_rng(seed)
+    names = [f"Team {i}" for i in range(teams)]
+    attack = rng.normal(0, 0.3, teams)
+    defence = rng.normal(0, 0.3, teams)
+    pairs = [(h, a) for h in range(teams) for a in range(teams) if h != a]
+    rows, day = [], pd.Timestamp('2022-08-06')
+    for _ in range(seasons):
+        order = rng.permutation(len(pairs))
+        for start in range(0, len(pairs), teams // 2):
+            for h, a in (pairs[i] for i in order[start:start + teams // 2]):
+                rows.append({
+                    'date': day, 'home_team': names[h], 'away_team': names[a],
+                    'home_goals': rng.poisson(np.exp(0.25 + attack[h] - defence[a])),
+                    'away_goals': rng.poisson(np.exp(attack[a] - defence[h])),
+                })
+            day += pd.Timedelta(days=7)
+    return pd.DataFrame(rows)
+
+
+def test_backtest_prices_fixture_like_the_app(tmp_path, monkeypatch):
+    matches = league_history()
+    fixture = len(matches) - 1
+    home_team, away_team = matches.loc[fixture, ['home_team', 'away_team']]
+    history = matches[matches['date'] < matches.loc[fixture, 'date']]
+
+    backtest = pre_match_prices(matches, pricing='dixon_coles').loc[fixture]
+
+    # The app reads models/ from the working directory
+    monkeypatch.chdir(tmp_path)
+    save_team_strength(history, 'seria_a', 'models', warm_start=False)
+    app = runpy.run_path(APP)
+    rates = pre_match_rates(matches).loc[fixture]
+    home_rate, away_rate, rho = app['expected_goals'](
+        home_team, away_team, APP_LEAGUE,
+        {'goals_avg': rates['home_goals_avg']}, {'goals_avg': rates['away_goals_avg']}
+    )
+    assert rho != 0.0
+    priced = app['price_goals'](home_rate, away_rate, engine='analytic', rho=rho)
+
+    for market, keys in MARKETS.items():
+        value = priced
+        for key in keys:
+            value = value[key]
+        # The backtest warm-starts its fits, the app's file is a cold fit: same optimum
+        assert backtest[market] == pytest.approx(value, abs=1e-4), market
@@ -8,7 +8,14 @@ This script will:
 4. Save trained models for the app
 
 Usage:
+    python train_model.py --league seria_a
     python train_model.py --league seria_a --data data/raw/seria_a.csv
+    python train_model.py --all                 # every league in the store, in parallel
+    python train_model.py --all --training-mode fast
+    python train_model.py --league seria_a --ratings elo   # add pre-match Elo features
+    python train_model.py --league seria_a --extra-windows 3 10 --ewm-halflife 4
+    python train_model.py --league seria_a --venue-split      # home form at home, away form away
+    python train_model.py --all --calibrate temperature  # calibrate on walk-forward predictions
 """
 
 import pandas as pd
@@ -17,20 +24,116 @@ from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import LabelEncoder
 import xgboost as xgb
 from sklearn.metrics import accuracy_score, classification_report
-import pickle
 import argparse
+import io
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from artifacts import CLASS_NAMES, data_hash, model_path, save_model
+from calibration import CALIBRATION_METHODS, calibration_report, fit_calibrator
+from features import FEATURE_COLUMNS, RollingFeatureEngine, feature_columns, vectorized_features
+from feature_store import FeatureStore
+from leagues import LEAGUE_CODES
+from match_store import MatchStore
+from ratings import RatingStore, join_ratings
+from team_stats import save_team_stats
+from validation import PROBA_COLUMNS, fold_periods, walk_forward_folds, walk_forward_validate
+
+FEATURE_BACKENDS = ['stream', 'vectorized']
+TRAINING_MODES = ['standard', 'fast']
+RATING_SYSTEMS = ['elo', 'glicko']  # glicko: Elo plus rating deviations
+
+# Fast training mode
+FAST_MAX_TREES = 1000
+FAST_EARLY_STOPPING_ROUNDS = 20
+FAST_VALIDATION_SIZE = 0.1  # Share of the training split used for early stopping
+
+
+MEMORY_SAMPLE_SECONDS = 0.01  # RSS sampling interval while a model trains
+
+
+def _rss_mb():
+    """Current resident memory of this process (MB), None without /proc (Linux only)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PeakMemory:
+    """
+    Peak resident memory growth of this process while the block runs (MB)
+
+    A background thread samples RSS, which also covers XGBoost's native
+    allocations that tracemalloc cannot see. It is measured in the process
+    that fits the league (a worker under --all), around the fit only.
+    `peak_mb` is NaN where RSS cannot be read.
+    """
+
+    def __enter__(self):
+        self.peak_mb = float('nan')
+        self._start = self._peak = _rss_mb()
+        self._done = threading.Event()
+        if self._start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(MEMORY_SAMPLE_SECONDS):
+            self._peak = max(self._peak, _rss_mb() or 0.0)
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            self._done.set()
+            self._thread.join()
+            self._peak = max(self._peak, _rss_mb() or 0.0)
+            self.peak_mb = self._peak - self._start
+        return False
+
+
+def rate_matches(matches, ratings='elo', store_dir='models'):
+    """Pre-match ratings for every match (all leagues) via the persistent rating store"""
+    if ratings not in RATING_SYSTEMS:
+        raise ValueError(f"Unknown rating system: {ratings}")
+    return RatingStore(store_dir, uncertainty=ratings == 'glicko').update(matches)
 
 class FootballModelTrainer:
-    def __init__(self, league_name):
+    def __init__(self, league_name, feature_backend='stream', n_jobs=None, training_mode='standard',
+                 ratings=None, rating_table=None, feature_config=None):
+        if feature_backend not in FEATURE_BACKENDS:
+            raise ValueError(f"Unknown feature backend: {feature_backend}")
+        if training_mode not in TRAINING_MODES:
+            raise ValueError(f"Unknown training mode: {training_mode}")
         self.league_name = league_name
+        self.feature_backend = feature_backend
+        self.training_mode = training_mode
+        self.n_jobs = n_jobs
+        self.ratings = ratings
+        self.rating_table = rating_table
+        # RollingFeatureEngine / vectorized_features keyword arguments
+        self.feature_config = {'window': 5, 'extra_windows': [], 'ewm_halflives': [], 'venue_split': False,
+                               **(feature_config or {})}
+        self.feature_columns = feature_columns(**self.feature_config)
         self.model = None
+        self.calibrator = None
+        self.metrics = {}
         self.label_encoder = LabelEncoder()
         
-    def load_data(self, filepath):
-        """Load match data from CSV"""
+    def load_data(self, filepath, seasons=None):
+        """Load match data from the Parquet match store (directory) or a CSV file"""
         print(f"📂 Loading data from {filepath}...")
-        df = pd.read_csv(filepath)
+        if os.path.isdir(filepath):
+            df = MatchStore(filepath).read(league=self.league_name, seasons=seasons)
+        else:
+            df = pd.read_csv(filepath)
+            if seasons is not None:
+                df = df[df['season'].isin(seasons)]
         print(f"✅ Loaded {len(df)} matches")
         return df
     
@@ -38,6 +141,67 @@ class FootballModelTrainer:
         """
         Create features for ML model
         
+        Features:
+        - Recent form (last 5 matches, plus any extra windows)
+        - Goals scored/conceded trends (optionally exponentially weighted)
+        - Home/away performance (home team at home, away team away with venue_split)
+        - Head-to-head record
+        - League position trends
+        - Pre-match ratings (when a rating table is set)
+        
+        Backends:
+        - stream: single chronological pass (RollingFeatureEngine)
+        - vectorized: columnar cumulative sums over a team-perspective table
+        """
+        print(f"🔧 Engineering features ({self.feature_backend})...")
+        
+        feature_df = self._backend_features(df)
+        if self.rating_table is not None:
+            feature_df = self._add_ratings(feature_df, df.sort_values('date').reset_index(drop=True))
+        
+        # Remove rows with missing data (first few matches won't have history)
+        feature_df = feature_df.dropna()
+        
+        print(f"✅ Created {len(feature_df)} training examples with {len(feature_df.columns)-1} features")
+        return feature_df
+    
+    def _backend_features(self, df):
+        if self.feature_backend == 'vectorized':
+            return vectorized_features(df, **self.feature_config)
+        return RollingFeatureEngine(**self.feature_config).transform(df)
+    
+    def _add_ratings(self, feature_df, keys):
+        """Insert pre-match rating columns before `result` (`keys` rows align with feature_df)"""
+        if 'league' not in keys.columns:
+            keys = keys.assign(league='')
+        ratings = join_ratings(keys, self.rating_table)
+        return pd.concat([feature_df.drop(columns='result'), ratings, feature_df[['result']]], axis=1)
+    
+    def engineer_features_incremental(self, df, store_dir='data/features'):
+        """
+        Engineer features through the persistent feature store
+        
+        Only matches not already in the store are processed; their rows
+        are appended and the full feature table is read back for training.
+        """
+        print("🔧 Engineering features (incremental)...")
+        
+        store = FeatureStore(self.league_name, store_dir=store_dir, **self.feature_config)
+        added = store.update(df)
+        stored = store.load()
+        feature_df = stored[feature_columns(**self.feature_config) + ['result']]
+        if self.rating_table is not None:
+            feature_df = self._add_ratings(feature_df, stored).dropna()
+        
+        print(f"✅ {added} new matches processed, {len(feature_df)} training examples in store")
+        return feature_df
+    
+    def engineer_features_reference(self, df):
+        """
+        Reference implementation: per-row scan over the full history (O(n²))
+        
+        Kept to cross-check the streaming engine; do not use for training.
+        
         Features:
         - Recent form (last 5 matches)
         - Goals scored/conceded trends
@@ -48,6 +212,7 @@ class FootballModelTrainer:
         print("🔧 Engineering features...")
         
         df = df.sort_values('date').reset_index(drop=True)
+        window = self.feature_config['window']
         features_list = []
         
         for idx, match in df.iterrows():
@@ -58,17 +223,17 @@ class FootballModelTrainer:
             # Get recent matches before this match
             recent_matches = df[df['date'] < match_date]
             
-            # Home team stats (last 5 matches)
+            # Home team stats (last `window` matches)
             home_recent = recent_matches[
                 (recent_matches['home_team'] == home_team) | 
                 (recent_matches['away_team'] == home_team)
-            ].tail(5)
+            ].tail(window)
             
-            # Away team stats (last 5 matches)
+            # Away team stats (last `window` matches)
             away_recent = recent_matches[
                 (recent_matches['home_team'] == away_team) | 
                 (recent_matches['away_team'] == away_team)
-            ].tail(5)
+            ].tail(window)
             
             # Calculate features
             features = {
@@ -85,9 +250,9 @@ class FootballModelTrainer:
                 'away_form_points': self._form_points(away_recent, away_team),
                 
                 # Head to head
-                'h2h_home_wins': self._h2h_wins(recent_matches, home_team, away_team, 'home'),
-                'h2h_away_wins': self._h2h_wins(recent_matches, home_team, away_team, 'away'),
-                'h2h_draws': self._h2h_draws(recent_matches, home_team, away_team),
+                'h2h_home_wins': self._h2h_wins(recent_matches, home_team, away_team, 'home', window),
+                'h2h_away_wins': self._h2h_wins(recent_matches, home_team, away_team, 'away', window),
+                'h2h_draws': self._h2h_draws(recent_matches, home_team, away_team, window),
                 
                 # Target variable
                 'result': self._get_result(match)
@@ -106,6 +271,25 @@ class FootballModelTrainer:
         print(f"✅ Created {len(feature_df)} training examples with {len(feature_df.columns)-1} features")
         return feature_df
     
+    def check_features(self, df, sample_size=500):
+        """
+        Cross-check the active backend against the reference loop
+        
+        Uses the first `sample_size` matches by date (any prefix of the
+        history is a valid dataset) since the reference scan is O(n²).
+        Only the base window's columns have a reference.
+        """
+        sample = df.sort_values('date').head(sample_size)
+        print(f"🔍 Cross-checking {self.feature_backend} features on {len(sample)} matches...")
+        
+        expected = self.engineer_features_reference(sample)
+        actual = self._backend_features(sample)[FEATURE_COLUMNS + ['result']].dropna()
+        pd.testing.assert_frame_equal(
+            actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False
+        )
+        
+        print("✅ Features match the reference implementation")
+    
     def _avg_goals_scored(self, matches, team):
         """Average goals scored in recent matches"""
         if len(matches) == 0:
@@ -164,12 +348,12 @@ class FootballModelTrainer:
                     points += 1
         return points / len(matches)
     
-    def _h2h_wins(self, matches, home_team, away_team, side):
+    def _h2h_wins(self, matches, home_team, away_team, side, window=5):
         """Head-to-head wins"""
         h2h = matches[
             ((matches['home_team'] == home_team) & (matches['away_team'] == away_team)) |
             ((matches['home_team'] == away_team) & (matches['away_team'] == home_team))
-        ].tail(5)
+        ].tail(window)
         
         if len(h2h) == 0:
             return 0
@@ -188,12 +372,12 @@ class FootballModelTrainer:
                     wins += 1
         return wins
     
-    def _h2h_draws(self, matches, home_team, away_team):
+    def _h2h_draws(self, matches, home_team, away_team, window=5):
         """Head-to-head draws"""
         h2h = matches[
             ((matches['home_team'] == home_team) & (matches['away_team'] == away_team)) |
             ((matches['home_team'] == away_team) & (matches['away_team'] == home_team))
-        ].tail(5)
+        ].tail(window)
         
         draws = sum(h2h['home_goals'] == h2h['away_goals'])
         return draws
@@ -208,12 +392,14 @@ class FootballModelTrainer:
             return 1  # Draw
     
     def train_model(self, feature_df, test_size=0.2):
-        """Train XGBoost model"""
-        print("🤖 Training model...")
+        """Train XGBoost model with the configured training mode"""
+        print(f"🤖 Training model ({self.training_mode})...")
+        start = time.perf_counter()
         
         # Separate features and target
         X = feature_df.drop('result', axis=1)
         y = feature_df['result']
+        self.feature_columns = list(X.columns)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -223,7 +409,122 @@ class FootballModelTrainer:
         print(f"  Training set: {len(X_train)} matches")
         print(f"  Test set: {len(X_test)} matches")
         
-        # Train XGBoost
+        with PeakMemory() as memory:
+            if self.training_mode == 'fast':
+                train_pred, test_pred, cv_scores = self._train_fast(X, y, X_train, X_test, y_train)
+            else:
+                train_pred, test_pred, cv_scores = self._train_standard(X, y, X_train, X_test, y_train)
+        
+        train_acc = accuracy_score(y_train, train_pred)
+        test_acc = accuracy_score(y_test, test_pred)
+        
+        print(f"\n📊 Model Performance:")
+        print(f"  Training Accuracy: {train_acc:.3f}")
+        print(f"  Test Accuracy: {test_acc:.3f}")
+        print(f"  Cross-val Accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
+        
+        # Walk-forward and calibration metrics are gathered before training, keep them
+        self.metrics.update({
+            'train_accuracy': train_acc,
+            'test_accuracy': test_acc,
+            'cv_accuracy': cv_scores.mean(),
+            'n_trees': self._trees_used(),
+            'train_seconds': time.perf_counter() - start,
+            'peak_memory_mb': memory.peak_mb,
+        })
+        print(f"  Trees: {self.metrics['n_trees']}")
+        print(f"  Training time: {self.metrics['train_seconds']:.1f}s, peak memory: +{self.metrics['peak_memory_mb']:.0f} MB")
+        
+        # Detailed report
+        print("\n📋 Classification Report:")
+        print(classification_report(y_test, test_pred, 
+                                   target_names=['Away Win', 'Draw', 'Home Win']))
+        
+        return self.model
+    
+    def walk_forward(self, df, feature_df=None, by='season', fold_weeks=4, min_train_periods=1,
+                     max_workers=None):
+        """
+        Walk-forward validation: train on every earlier period, test on the next
+        
+        Features are built once (or reused from `feature_df`, which must come
+        from engineer_features on the same `df`) and sliced per fold.
+        
+        Returns:
+            (per-fold metric table, out-of-fold probabilities)
+        """
+        ordered = df.sort_values('date').reset_index(drop=True)
+        if feature_df is None:
+            feature_df = self.engineer_features(df)
+        rows = ordered.loc[feature_df.index]
+        
+        periods, names = fold_periods(rows['date'], rows.get('season'), by=by, fold_weeks=fold_weeks)
+        folds = walk_forward_folds(periods, names, min_train_periods)
+        print(f"🚶 Walk-forward validation: {len(folds)} folds by {by} ({self.training_mode})...")
+        
+        start = time.perf_counter()
+        table, oof = walk_forward_validate(feature_df, folds, self.training_mode, max_workers)
+        print(table.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+        print(f"  Walk-forward time: {time.perf_counter() - start:.1f}s")
+        
+        if len(table):
+            overall = table.iloc[-1]
+            self.metrics.update(wf_log_loss=overall['log_loss'], wf_brier=overall['brier'],
+                                wf_accuracy=overall['accuracy'])
+        return table, oof
+    
+    def calibrate(self, oof, method='temperature'):
+        """
+        Fit the probability calibration map on walk-forward out-of-fold predictions
+        
+        Prints raw vs calibrated ECE and log loss (each fold calibrated
+        with a map fitted on the earlier folds) and the reliability table.
+        A map is only kept when it lowers both out-of-sample log loss and
+        ECE; a rejected isotonic map falls back to temperature, and if that
+        fails too the model stays uncalibrated. metrics['calibration']
+        records the method kept ('none' when rejected).
+        """
+        if len(oof) == 0:
+            print("⚠️ No out-of-fold predictions, skipping calibration")
+            return None
+        
+        self.calibrator = None
+        candidates = [method] if method == 'temperature' else [method, 'temperature']
+        for candidate in candidates:
+            print(f"🎯 Calibrating probabilities ({candidate}) on {len(oof)} out-of-fold predictions...")
+            report = calibration_report(oof, candidate)
+            print(f"  ECE:      {report['ece_raw']:.4f} raw -> {report['ece_calibrated']:.4f} calibrated")
+            print(f"  Log loss: {report['log_loss_raw']:.4f} raw -> {report['log_loss_calibrated']:.4f} calibrated")
+            reliability = report['reliability_raw'].merge(
+                report['reliability_calibrated'], on=['outcome', 'bin_low', 'bin_high'],
+                how='outer', suffixes=('_raw', '_calibrated')
+            )
+            print(reliability.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+            if (report['log_loss_calibrated'] < report['log_loss_raw']
+                    and report['ece_calibrated'] < report['ece_raw']):
+                break
+            print(f"⚠️ {candidate.title()} calibration did not improve out-of-sample log loss and ECE, rejected")
+        else:
+            print("⚠️ Keeping raw probabilities")
+            self.metrics.update(calibration='none', ece_raw=report['ece_raw'], ece_calibrated=report['ece_raw'])
+            return None
+        
+        self.calibrator = fit_calibrator(oof[PROBA_COLUMNS].to_numpy(), oof['result'].to_numpy(), candidate)
+        self.calibrator.info.update(folds=int(oof['fold'].nunique()),
+                                    ece_raw=report['ece_raw'], ece_calibrated=report['ece_calibrated'])
+        self.metrics.update(calibration=candidate, ece_raw=report['ece_raw'],
+                            ece_calibrated=report['ece_calibrated'])
+        return self.calibrator
+    
+    def _trees_used(self):
+        """Trees used for prediction (best iteration after early stopping)"""
+        try:
+            return self.model.best_iteration + 1
+        except AttributeError:
+            return self.model.get_booster().num_boosted_rounds()
+    
+    def _train_standard(self, X, y, X_train, X_test, y_train):
+        """Original path: 200 exact-method trees, five sequential CV refits"""
         self.model = xgb.XGBClassifier(
             max_depth=6,
             learning_rate=0.1,
@@ -231,7 +532,8 @@ class FootballModelTrainer:
             objective='multi:softprob',
             num_class=3,
             random_state=42,
-            eval_metric='mlogloss'
+            eval_metric='mlogloss',
+            n_jobs=self.n_jobs
         )
         
         self.model.fit(X_train, y_train)
@@ -240,65 +542,284 @@ class FootballModelTrainer:
         train_pred = self.model.predict(X_train)
         test_pred = self.model.predict(X_test)
         
-        train_acc = accuracy_score(y_train, train_pred)
-        test_acc = accuracy_score(y_test, test_pred)
-        
-        print(f"\n📊 Model Performance:")
-        print(f"  Training Accuracy: {train_acc:.3f}")
-        print(f"  Test Accuracy: {test_acc:.3f}")
-        
         # Cross-validation
         cv_scores = cross_val_score(self.model, X, y, cv=5, scoring='accuracy')
-        print(f"  Cross-val Accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
+        return train_pred, test_pred, cv_scores
+    
+    def _train_fast(self, X, y, X_train, X_test, y_train, cv_folds=5):
+        """
+        Histogram trees with early stopping on a validation fold
         
-        # Detailed report
-        print("\n📋 Classification Report:")
-        print(classification_report(y_test, test_pred, 
-                                   target_names=['Away Win', 'Draw', 'Home Win']))
+        The validation fold comes out of the training split (the test set
+        stays untouched). CV folds are fitted in parallel with the number
+        of trees early stopping settled on, so no fold grows trees the
+        main model found redundant.
+        """
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=FAST_VALIDATION_SIZE, random_state=42, stratify=y_train
+        )
         
-        return self.model
+        params = dict(
+            max_depth=6,
+            learning_rate=0.1,
+            objective='multi:softprob',
+            num_class=3,
+            random_state=42,
+            eval_metric='mlogloss',
+            tree_method='hist',
+        )
+        self.model = xgb.XGBClassifier(
+            n_estimators=FAST_MAX_TREES,
+            early_stopping_rounds=FAST_EARLY_STOPPING_ROUNDS,
+            n_jobs=n_jobs,
+            **params
+        )
+        self.model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        n_trees = self.model.best_iteration + 1
+        print(f"  Early stopping: {n_trees} trees (validation set: {len(X_val)} matches)")
+        
+        # One predict call for train and test
+        predictions = self.model.predict(pd.concat([X_train, X_test]))
+        train_pred, test_pred = predictions[:len(X_train)], predictions[len(X_train):]
+        
+        # Parallel CV folds, each with a fixed tree count and its share of the threads
+        fold_jobs = min(cv_folds, n_jobs)
+        cv_model = xgb.XGBClassifier(
+            n_estimators=n_trees,
+            n_jobs=max(1, n_jobs // fold_jobs),
+            **params
+        )
+        cv_scores = cross_val_score(cv_model, X, y, cv=cv_folds, scoring='accuracy', n_jobs=fold_jobs)
+        return train_pred, test_pred, cv_scores
     
-    def save_model(self, output_dir='models'):
-        """Save trained model"""
-        os.makedirs(output_dir, exist_ok=True)
+    def save_model(self, output_dir='models', df=None):
+        """
+        Save the trained booster (native UBJSON) with a metadata sidecar
         
-        filename = f"{output_dir}/{self.league_name}_model.pkl"
+        `df` is the training match data, used for the date range and data hash.
+        """
+        filename = model_path(self.league_name, output_dir)
         
-        with open(filename, 'wb') as f:
-            pickle.dump(self.model, f)
+        metadata = {
+            'league': self.league_name,
+            'feature_columns': self.feature_columns,
+            'classes': CLASS_NAMES,
+            'n_trees': int(self._trees_used()),
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'training_mode': self.training_mode,
+            'feature_backend': self.feature_backend,
+            'feature_config': self.feature_config,
+            'ratings': self.ratings,
+            'calibration': self.calibrator.to_dict() if self.calibrator is not None else None,
+            'metrics': {k: v if isinstance(v, str) else float(v) for k, v in self.metrics.items()},
+            'xgboost_version': xgb.__version__,
+        }
+        if df is not None:
+            dates = pd.to_datetime(df['date'])
+            metadata.update(
+                date_range=[f"{dates.min():%Y-%m-%d}", f"{dates.max():%Y-%m-%d}"],
+                matches=len(df),
+                data_hash=data_hash(df),
+            )
+        save_model(self.model, filename, metadata)
         
         print(f"\n💾 Model saved to: {filename}")
         return filename
 
+def calibration_folds(df):
+    """Walk-forward period for calibration: seasons when the data has them"""
+    return 'season' if 'season' in df.columns else 'week'
+
+
+def train_league(league, df, output_dir='models', feature_backend='stream', n_jobs=None,
+                 training_mode='standard', ratings=None, rating_table=None, feature_config=None,
+                 calibrate=None):
+    """
+    Train and save one league's model and team stats
+    
+    Runs in a worker process under train_all; the trainer's log is
+    captured and returned with the summary instead of interleaving.
+    With `calibrate`, a walk-forward run (folds fitted one at a time)
+    supplies the out-of-fold predictions for the calibration map.
+    """
+    start = time.perf_counter()
+    log = io.StringIO()
+    summary = {'league': league, 'matches': len(df)}
+    try:
+        with redirect_stdout(log):
+            trainer = FootballModelTrainer(league, feature_backend=feature_backend, n_jobs=n_jobs,
+                                           training_mode=training_mode, ratings=ratings,
+                                           rating_table=rating_table, feature_config=feature_config)
+            feature_df = trainer.engineer_features(df)
+            if calibrate:
+                _, oof = trainer.walk_forward(df, feature_df, by=calibration_folds(df), max_workers=1)
+                trainer.calibrate(oof, calibrate)
+            trainer.train_model(feature_df)
+            trainer.save_model(output_dir, df)
+            save_team_stats(df, league, output_dir, trainer.feature_config)
+        summary.update(trainer.metrics, examples=len(feature_df), status='ok')
+    except Exception as e:
+        summary.update(status=f"failed: {e}")
+    summary['seconds'] = time.perf_counter() - start
+    return summary, log.getvalue()
+
+
+def train_all(data='data/matches', output_dir='models', feature_backend='stream',
+              seasons=None, max_workers=None, verbose=False, training_mode='standard', ratings=None,
+              feature_config=None, calibrate=None):
+    """
+    Train every league found in the match store in a process pool
+    
+    The store is read once; each worker gets its league's rows (and its
+    rows of the rating table, which is updated once for all leagues).
+    XGBoost threads are split between workers so the pool does not
+    oversubscribe the CPU.
+    """
+    print(f"📂 Loading data from {data}...")
+    if os.path.isdir(data):
+        df = MatchStore(data).read(seasons=seasons)
+    else:
+        df = pd.read_csv(data)
+        if seasons is not None:
+            df = df[df['season'].isin(seasons)]
+    leagues = sorted(df['league'].astype(str).unique())
+    print(f"✅ Loaded {len(df)} matches across {len(leagues)} leagues")
+    
+    rating_table = None
+    if ratings:
+        print(f"📈 Updating {ratings} ratings...")
+        rating_table = rate_matches(df, ratings, output_dir)
+    
+    cpus = os.cpu_count() or 1
+    max_workers = max_workers or min(len(leagues), cpus)
+    n_jobs = max(1, cpus // max_workers)
+    print(f"🤖 Training with {max_workers} workers x {n_jobs} threads...")
+    
+    start = time.perf_counter()
+    league_col = df['league'].astype(str)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(train_league, league, df[league_col == league].reset_index(drop=True),
+                            output_dir, feature_backend, n_jobs, training_mode, ratings,
+                            None if rating_table is None else rating_table[rating_table['league'] == league],
+                            feature_config, calibrate)
+            for league in leagues
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    
+    if verbose:
+        for summary, log in results:
+            print(f"\n===== {summary['league']} =====\n{log}")
+    
+    summary = pd.DataFrame([s for s, _ in results])
+    columns = [c for c in ['league', 'matches', 'examples', 'train_accuracy', 'test_accuracy',
+                           'cv_accuracy', 'calibration', 'ece_raw', 'ece_calibrated', 'n_trees', 'train_seconds',
+                           'peak_memory_mb', 'seconds', 'status']
+               if c in summary.columns]
+    print("\n📊 Training Summary:")
+    print(summary[columns].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"\n⏱️ Wall time: {elapsed:.1f}s (slowest league {summary['seconds'].max():.1f}s)")
+    return summary
+
+
 def main():
     parser = argparse.ArgumentParser(description='Train football prediction model')
-    parser.add_argument('--league', type=str, required=True,
-                       choices=['seria_a', 'serie_b', 'laliga'],
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--league', type=str,
+                       choices=list(LEAGUE_CODES),
                        help='League to train model for')
-    parser.add_argument('--data', type=str, required=True,
-                       help='Path to CSV file with match data')
+    target.add_argument('--all', action='store_true',
+                       help='Train every league in the data in parallel')
+    parser.add_argument('--data', type=str, default='data/matches',
+                       help='Match store directory or path to a CSV file with match data')
+    parser.add_argument('--seasons', type=str, nargs='+', default=None,
+                       help='Only train on these seasons, e.g. 2022/2023 2023/2024')
     parser.add_argument('--output', type=str, default='models',
                        help='Output directory for trained model')
+    parser.add_argument('--feature-backend', type=str, default='stream',
+                       choices=FEATURE_BACKENDS,
+                       help='Feature engineering backend')
+    parser.add_argument('--check-features', type=int, nargs='?', const=500, default=None,
+                       metavar='N',
+                       help='Cross-check features against the reference loop on the first N matches')
+    parser.add_argument('--feature-store', type=str, default=None, metavar='DIR',
+                       help='Persist features in DIR and only process new matches (e.g. data/features)')
+    parser.add_argument('--training-mode', type=str, default='standard',
+                       choices=TRAINING_MODES,
+                       help='standard: 200 trees, exact method; fast: hist trees with early stopping and parallel CV')
+    parser.add_argument('--n-jobs', type=int, default=None,
+                       help='XGBoost threads for a single league (default: all cores)')
+    parser.add_argument('--extra-windows', type=int, nargs='+', default=[], metavar='N',
+                       help='Also build form/head-to-head features over these windows (e.g. 3 10)')
+    parser.add_argument('--ewm-halflife', type=float, nargs='+', default=[], metavar='H',
+                       help='Add exponentially weighted team form with these half-lives (in matches)')
+    parser.add_argument('--venue-split', action='store_true',
+                       help='Add home-team-at-home / away-team-away form features')
+    parser.add_argument('--ratings', type=str, default=None, choices=RATING_SYSTEMS,
+                       help='Add pre-match team ratings as features (rated over every league in the data)')
+    parser.add_argument('--calibrate', type=str, default=None, choices=CALIBRATION_METHODS,
+                       help='Calibrate probabilities on walk-forward out-of-fold predictions')
+    parser.add_argument('--walk-forward', type=str, default=None, choices=['season', 'week'],
+                       help='Report walk-forward validation by season or by blocks of weeks before training')
+    parser.add_argument('--fold-weeks', type=int, default=4,
+                       help='Weeks per fold with --walk-forward week')
+    parser.add_argument('--min-train', type=int, default=1,
+                       help='Periods in the first training window with --walk-forward')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --all (default: one per league, up to the CPU count)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='With --all, print each league\'s full training log')
     
     args = parser.parse_args()
+    feature_config = {'extra_windows': args.extra_windows, 'ewm_halflives': args.ewm_halflife,
+                      'venue_split': args.venue_split}
+    
+    if args.all:
+        train_all(args.data, args.output, args.feature_backend, args.seasons,
+                  args.workers, args.verbose, args.training_mode, args.ratings, feature_config,
+                  args.calibrate)
+        return
     
     # Initialize trainer
-    trainer = FootballModelTrainer(args.league)
+    trainer = FootballModelTrainer(args.league, feature_backend=args.feature_backend,
+                                   n_jobs=args.n_jobs, training_mode=args.training_mode,
+                                   ratings=args.ratings, feature_config=feature_config)
     
     # Load data
-    df = trainer.load_data(args.data)
+    df = trainer.load_data(args.data, seasons=args.seasons)
+    
+    if args.ratings:
+        print(f"📈 Updating {args.ratings} ratings...")
+        all_matches = MatchStore(args.data).read(seasons=args.seasons) if os.path.isdir(args.data) else df
+        trainer.rating_table = rate_matches(all_matches, args.ratings, args.output)
+    
+    if args.check_features:
+        trainer.check_features(df, sample_size=args.check_features)
     
     # Engineer features
-    feature_df = trainer.engineer_features(df)
+    if args.feature_store:
+        feature_df = trainer.engineer_features_incremental(df, store_dir=args.feature_store)
+    else:
+        feature_df = trainer.engineer_features(df)
+    
+    if args.walk_forward or args.calibrate:
+        _, oof = trainer.walk_forward(df, None if args.feature_store else feature_df,
+                                      by=args.walk_forward or calibration_folds(df),
+                                      fold_weeks=args.fold_weeks, min_train_periods=args.min_train)
+        if args.calibrate:
+            trainer.calibrate(oof, args.calibrate)
     
     # Train model
     trainer.train_model(feature_df)
     
     # Save model
-    trainer.save_model(args.output)
+    trainer.save_model(args.output, df)
+    stats_file = save_team_stats(df, args.league, args.output, trainer.feature_config)
+    print(f"💾 Team stats saved to: {stats_file}")
     
     print("\n✅ Training complete!")
-    print(f"📝 Next step: Update app.py to load this model instead of using demo predictions")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,141 @@
+"""
+Walk-forward validation
+
+Expanding-window evaluation in time order: each fold trains on every
+period before it and tests on the next one, so no future match ever
+reaches training. Periods are seasons or fixed blocks of weeks.
+
+Features are computed once for the whole history (every row only uses
+matches played before it, so this leaks nothing) and each fold slices
+the same arrays by index. Folds are fitted in parallel with joblib,
+which memory-maps the shared arrays into the workers instead of copying
+them per fold.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, log_loss
+
+CLASSES = [0, 1, 2]  # Away Win, Draw, Home Win
+PROBA_COLUMNS = ['p_away', 'p_draw', 'p_home']
+
+EARLY_STOPPING_ROUNDS = 20
+VALIDATION_SIZE = 0.1  # Latest share of each fold's training rows used for early stopping
+
+MODEL_PARAMS = dict(
+    max_depth=6,
+    learning_rate=0.1,
+    objective='multi:softprob',
+    num_class=3,
+    random_state=42,
+    eval_metric='mlogloss',
+)
+
+
+def fold_periods(dates, seasons=None, by='season', fold_weeks=4):
+    """
+    Period code per row (0, 1, ... in time order) plus a name per code
+
+    by='season' groups rows by `seasons`, ordered by each season's first
+    date; by='week' cuts the timeline into blocks of `fold_weeks` weeks.
+    """
+    dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+    if by == 'season':
+        if seasons is None:
+            raise ValueError("Season folds need a season per row")
+        seasons = pd.Series(seasons).astype(str).reset_index(drop=True)
+        order = dates.groupby(seasons).min().sort_values().index
+        codes = pd.Categorical(seasons, categories=order, ordered=True).codes
+        return np.asarray(codes), list(order)
+    if by == 'week':
+        block = ((dates - dates.min()).dt.days // (7 * fold_weeks)).to_numpy()
+        blocks, codes = np.unique(block, return_inverse=True)
+        starts = dates.groupby(codes).min()
+        return codes, [f"{start:%Y-%m-%d}" for start in starts]
+    raise ValueError(f"Unknown fold period: {by} (choose from season, week)")
+
+
+def walk_forward_folds(periods, names, min_train_periods=1):
+    """[(name, train_idx, test_idx)] with an expanding training window"""
+    folds = []
+    for k in range(min_train_periods, len(names)):
+        train_idx = np.flatnonzero(periods < k)
+        test_idx = np.flatnonzero(periods == k)
+        if len(train_idx) and len(test_idx):
+            folds.append((names[k], train_idx, test_idx))
+    return folds
+
+
+def multiclass_brier(y, proba):
+    """Mean squared distance between predicted probabilities and the one-hot outcome"""
+    onehot = np.zeros_like(proba)
+    onehot[np.arange(len(y)), y] = 1
+    return float(np.mean(np.sum((proba - onehot) ** 2, axis=1)))
+
+
+def _fit_fold(X, y, train_idx, test_idx, training_mode, n_jobs):
+    """Fit one fold on sliced rows and return its test probabilities"""
+    if training_mode == 'fast':
+        # Rows are in time order: stop early on the most recent training matches
+        n_val = max(1, int(len(train_idx) * VALIDATION_SIZE))
+        fit_idx, val_idx = train_idx[:-n_val], train_idx[-n_val:]
+        model = xgb.XGBClassifier(n_estimators=1000, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                                  tree_method='hist', n_jobs=n_jobs, **MODEL_PARAMS)
+        model.fit(X[fit_idx], y[fit_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+    else:
+        model = xgb.XGBClassifier(n_estimators=200, n_jobs=n_jobs, **MODEL_PARAMS)
+        model.fit(X[train_idx], y[train_idx])
+    return model.predict_proba(X[test_idx])
+
+
+def walk_forward_validate(feature_df, folds, training_mode='fast', max_workers=None):
+    """
+    Fit every fold and score it
+
+    Args:
+        feature_df: feature columns + result, rows in time order
+        folds: output of walk_forward_folds (positions into feature_df)
+        training_mode: 'standard' (200 trees) or 'fast' (hist + early stopping)
+
+    Returns:
+        (per-fold metric table with an 'all' row, out-of-fold predictions
+        indexed like feature_df with PROBA_COLUMNS, result and fold)
+    """
+    X = feature_df.drop(columns='result').to_numpy(dtype=np.float64)
+    y = feature_df['result'].to_numpy(dtype=np.int64)
+
+    cpus = os.cpu_count() or 1
+    max_workers = max_workers or max(1, min(len(folds), cpus))
+    n_jobs = max(1, cpus // max_workers)
+    probas = Parallel(n_jobs=max_workers)(
+        delayed(_fit_fold)(X, y, train_idx, test_idx, training_mode, n_jobs)
+        for _, train_idx, test_idx in folds
+    )
+
+    rows, oof = [], []
+    for (name, train_idx, test_idx), proba in zip(folds, probas):
+        y_test = y[test_idx]
+        rows.append({
+            'fold': name,
+            'train': len(train_idx),
+            'test': len(test_idx),
+            'log_loss': log_loss(y_test, proba, labels=CLASSES),
+            'brier': multiclass_brier(y_test, proba),
+            'accuracy': accuracy_score(y_test, proba.argmax(axis=1)),
+        })
+        fold_oof = pd.DataFrame(proba, columns=PROBA_COLUMNS, index=feature_df.index[test_idx])
+        oof.append(fold_oof.assign(result=y_test, fold=name))
+
+    table = pd.DataFrame(rows)
+    if len(table):
+        weights = table['test'].to_numpy()
+        overall = {'fold': 'all', 'train': pd.NA, 'test': weights.sum()}
+        for metric in ('log_loss', 'brier', 'accuracy'):
+            overall[metric] = np.average(table[metric], weights=weights)
+        table = pd.concat([table, pd.DataFrame([overall])], ignore_index=True)
+        table['train'] = table['train'].astype('Int64')
+    return table, (pd.concat(oof) if oof else pd.DataFrame(columns=PROBA_COLUMNS + ['result', 'fold']))
@@ -0,0 +1,198 @@
+"""
+Value-bet scanner
+
+Takes a long table of fixtures x markets x bookmaker odds, attaches the
+model probability for every line and computes EV and the value-bet rules
+in one vectorized pass. Used by the app for a single match and headless
+from the command line for a whole fixture list.
+
+Markets are named after the price_fixtures columns ('over_2_5',
+'btts_no', 'corners_over_10_5', 'cards_under_4_5', 'home_win', ...).
+
+Usage:
+    python value_bets.py --fixtures fixtures.csv --odds odds.csv
+    python value_bets.py --fixtures fixtures.csv --odds odds.csv --edge 0.03 --confidence 0.55
+
+fixtures.csv: fixture, home_team, away_team and the pricing.RATE_COLUMNS
+odds.csv:     fixture, market, odds (any extra columns, e.g. bookmaker, are kept)
+"""
+
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+from pricing import price_fixture_frame
+
+# How one side of a market is picked before the value rules apply:
+# - probability: back the side the model thinks is more likely
+# - ev: back the side with the higher expected value
+PICK_RULES = {
+    'goals': 'probability',
+    'btts': 'probability',
+    'corners': 'ev',
+    'cards': 'ev',
+    '1x2': 'ev',
+}
+
+RESULT_LABELS = {'home_win': 'Home Win', 'draw': 'Draw', 'away_win': 'Away Win'}
+
+_LINE_RE = re.compile(r'^(?:(corners|cards)_)?(over|under)_(\d+)_(\d+)$')
+
+
+def parse_market(market):
+    """
+    Split a market column into (family, group, label)
+
+    'over_2_5'          -> ('goals', 'goals_2_5', 'Over 2.5')
+    'corners_under_10_5' -> ('corners', 'corners_10_5', 'Under 10.5 corners')
+    'btts_yes'          -> ('btts', 'btts', 'BTTS Yes')
+    'home_win'          -> ('1x2', '1x2', 'Home Win')
+    """
+    if market in RESULT_LABELS:
+        return '1x2', '1x2', RESULT_LABELS[market]
+    if market in ('btts_yes', 'btts_no'):
+        return 'btts', 'btts', f"BTTS {market.split('_')[1].title()}"
+
+    m = _LINE_RE.match(market)
+    if m is None:
+        raise ValueError(f"Unknown market: {market}")
+    family, side, whole, frac = m.groups()
+    line = f"{whole}.{frac}"
+    if family is None:
+        return 'goals', f"goals_{whole}_{frac}", f"{side.title()} {line}"
+    return family, f"{family}_{whole}_{frac}", f"{side.title()} {line} {family}"
+
+
+def market_confidence(lines):
+    """
+    Model probability of the favoured side of each line's market group
+
+    Two-way markets are max(p, 1 - p), so it does not matter which side is
+    quoted. For 1X2 the unquoted outcome is 1 minus the other two when only
+    one is missing; with two missing only the quoted outcome is known.
+    """
+    prob = lines['model_prob'].to_numpy(dtype=np.float64)
+    three_way = lines['family'].to_numpy() == '1x2'
+    side = np.where(three_way, prob, np.maximum(prob, 1 - prob))
+    grouped = pd.Series(side, index=lines.index).groupby([lines['fixture'], lines['group']], sort=False)
+    confidence = grouped.transform('max').to_numpy(copy=True)
+
+    if three_way.any():
+        outcomes = lines.loc[three_way, ['fixture', 'market', 'model_prob']].drop_duplicates(['fixture', 'market'])
+        quoted = outcomes.groupby('fixture')['model_prob'].agg(['size', 'sum'])
+        missing = (1 - quoted['sum']).where(quoted['size'] == len(RESULT_LABELS) - 1, 0.0)
+        rest = lines['fixture'].map(missing).to_numpy(dtype=np.float64)
+        confidence[three_way] = np.maximum(confidence[three_way], rest[three_way])
+    return confidence
+
+
+def scan_value_bets(lines, edge_threshold=0.05, confidence_threshold=0.60):
+    """
+    Evaluate every line with NumPy
+
+    Args:
+        lines: DataFrame with columns fixture, market, odds, model_prob
+        edge_threshold: minimum EV for a value bet
+        confidence_threshold: minimum model probability of the favoured side
+
+    Returns:
+        lines plus family, group, selection, ev, confidence, selected and
+        value columns, ranked by EV (value bets first)
+    """
+    lines = lines.reset_index(drop=True).copy()
+    parsed = [parse_market(market) for market in lines['market']]
+    lines['family'] = [p[0] for p in parsed]
+    lines['group'] = [p[1] for p in parsed]
+    lines['selection'] = [p[2] for p in parsed]
+
+    prob = lines['model_prob'].to_numpy(dtype=np.float64)
+    odds = lines['odds'].to_numpy(dtype=np.float64)
+    ev = prob * odds - 1
+    lines['ev'] = ev
+
+    # Confidence and the pick are per fixture and market group
+    lines['confidence'] = market_confidence(lines)
+    by_ev = lines['family'].map(PICK_RULES).to_numpy() == 'ev'
+    lines['_score'] = np.where(by_ev, ev, prob)
+    # Best score per group; ties (the same side at several bookmakers) go to the best price
+    ranked = lines.sort_values(['_score', 'ev'], ascending=[False, False], kind='stable')
+    picks = ranked.groupby(['fixture', 'group'], sort=False).head(1).index
+    selected = np.zeros(len(lines), dtype=bool)
+    selected[picks] = True
+    lines['selected'] = selected
+
+    lines['value'] = selected & (ev > edge_threshold) & (lines['confidence'].to_numpy() >= confidence_threshold)
+
+    lines = lines.drop(columns='_score')
+    return lines.sort_values(['value', 'ev'], ascending=[False, False], kind='stable').reset_index(drop=True)
+
+
+def attach_model_probs(odds, priced):
+    """Look up each odds line's model probability in the priced fixture table"""
+    odds = odds.copy()
+    missing = sorted(set(odds['market']) - set(priced.columns))
+    if missing:
+        raise ValueError(f"No model price for markets: {missing}")
+
+    rows = priced.index.get_indexer(odds['fixture'])
+    if (rows < 0).any():
+        unknown = odds.loc[rows < 0, 'fixture'].unique()
+        raise ValueError(f"Odds for unknown fixtures: {list(unknown)}")
+
+    cols = priced.columns.get_indexer(odds['market'])
+    odds['model_prob'] = priced.to_numpy(dtype=np.float64)[rows, cols]
+    return odds
+
+
+def scan_fixtures(fixtures, odds, edge_threshold=0.05, confidence_threshold=0.60, engine='analytic'):
+    """Price a fixture list and scan its odds for value"""
+    fixtures = fixtures.set_index('fixture') if 'fixture' in fixtures.columns else fixtures
+    priced = price_fixture_frame(fixtures, engine=engine)
+    return scan_value_bets(attach_model_probs(odds, priced), edge_threshold, confidence_threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan bookmaker odds for value bets')
+    parser.add_argument('--fixtures', type=str, required=True,
+                       help='CSV with fixture ids and expected rates')
+    parser.add_argument('--odds', type=str, required=True,
+                       help='CSV with fixture, market, odds')
+    parser.add_argument('--edge', type=float, default=0.05,
+                       help='Minimum EV (0.05 = 5%%)')
+    parser.add_argument('--confidence', type=float, default=0.60,
+                       help='Minimum model confidence')
+    parser.add_argument('--engine', type=str, default='analytic', choices=['analytic', 'monte_carlo'],
+                       help='Pricing engine')
+    parser.add_argument('--top', type=int, default=50,
+                       help='Value bets to print')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write every scanned line to this CSV')
+
+    args = parser.parse_args()
+
+    fixtures = pd.read_csv(args.fixtures)
+    odds = pd.read_csv(args.odds)
+
+    scanned = scan_fixtures(fixtures, odds, args.edge, args.confidence, args.engine)
+    value = scanned[scanned['value']]
+
+    print(f"🔎 Scanned {len(scanned)} lines across {scanned['fixture'].nunique()} fixtures")
+    if value.empty:
+        print("⚠️ No value bets with current settings")
+    else:
+        print(f"✅ {len(value)} value bets:\n")
+        if {'home_team', 'away_team'} <= set(fixtures.columns):
+            value = value.merge(fixtures[['fixture', 'home_team', 'away_team']], on='fixture', how='left')
+        columns = [c for c in ['fixture', 'home_team', 'away_team', 'selection', 'odds',
+                               'model_prob', 'ev', 'confidence', 'bookmaker'] if c in value.columns]
+        print(value[columns].head(args.top).to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.output:
+        scanned.to_csv(args.output, index=False)
+        print(f"\n💾 All lines saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()